@@ -1,5 +1,9 @@
 import dash
+from dash import DiskcacheManager
 from dash.dependencies import Input, Output, State
+import diskcache
+from flask.json.provider import DefaultJSONProvider
+import orjson
 import logging
 import sys
 import os
@@ -16,6 +20,31 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 UPDATE_INTERVAL = int(os.getenv("UPDATE_INTERVAL", 1800))
+# Live balances get their own, faster tier so deposits and fills made outside
+# the bot show up within seconds; our own trades also push a refresh
+ACCOUNT_INTERVAL = int(os.getenv("ACCOUNT_INTERVAL", 15))
+CACHE_DIR = os.getenv("CACHE_DIR", ".dash-cache")
+
+# Long-running callbacks (strategy execution) run in worker processes so they
+# don't tie up the request threads serving the interval callbacks
+background_callback_manager = DiskcacheManager(diskcache.Cache(CACHE_DIR))
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson
+
+    Dash parses every callback request body through the Flask app's
+    JSON provider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj,
+            default=self.default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 # Import layout and callbacks after app creation
 app = dash.Dash(
@@ -23,14 +52,18 @@ app = dash.Dash(
     title="CryptoTrader",
     meta_tags=[{"name": "viewport", "content": "width=device-width, initial-scale=1"}],
     suppress_callback_exceptions=True,
+    background_callback_manager=background_callback_manager,
 )
+# Callback responses already go through plotly's JSON encoder, which picks
+# orjson automatically once it is installed
+app.server.json = OrjsonProvider(app.server)
 
 # Now import the layout and register callbacks
 from layout import create_layout
 from callbacks import register_callbacks
 
 # Set app layout
-app.layout = create_layout(UPDATE_INTERVAL)
+app.layout = create_layout(UPDATE_INTERVAL, ACCOUNT_INTERVAL)
 
 # Register callbacks
 register_callbacks(app)
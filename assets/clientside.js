@@ -0,0 +1,268 @@
+// assets/clientside.js
+// Pure-view callbacks that run in the browser instead of round-tripping to Dash
+
+(function () {
+    // Build a dash_html_components node the renderer understands
+    function h(type, props, children) {
+        var p = Object.assign({}, props || {});
+        if (children !== undefined) {
+            p.children = children;
+        }
+        return {type: type, namespace: "dash_html_components", props: p};
+    }
+
+    var NOTE_TITLE_STYLE = {display: "flex", alignItems: "center", gap: "0.5rem"};
+
+    function strategyNotes(title, lines) {
+        return [
+            h("H4", {style: NOTE_TITLE_STYLE}, [
+                h("I", {className: "fas fa-lightbulb", style: {color: "#F59E0B"}}),
+                h("Span", {}, title)
+            ]),
+            h("Div", {className: "strategy-notes"}, lines.map(function (line) {
+                return h("P", {}, line);
+            }))
+        ];
+    }
+
+    // Static note trees, built once rather than on every toggle
+    var FEAR_GREED_NOTES = strategyNotes("Fear & Greed Strategy", [
+        "• Buy when Fear & Greed < 40 with 50% of USDT",
+        "• Sell when Fear & Greed > 60 with 50% of BTC",
+        "• Reset when BTC ≥ 0.011 to [USDT: 200, BTC: 0.0022]"
+    ]);
+
+    var DUAL_TRADE_NOTES = strategyNotes("Dual-Trade Strategy", [
+        "• Buy when Fear & Greed < threshold at discount price",
+        "• Sell when Fear & Greed > threshold at premium price",
+        "• Never sell at a loss - always above average cost",
+        "• Reinvest profits based on reinvestment rate"
+    ]);
+
+    function dataItem(value, label) {
+        return h("Div", {className: "data-item"}, [
+            h("Div", {className: "data-value"}, value),
+            h("Div", {className: "data-label"}, label)
+        ]);
+    }
+
+    function changeValue(pct) {
+        return [
+            h("Span", {className: pct > 0 ? "positive" : "negative"}, Math.abs(pct) + "% "),
+            h("I", {
+                className: "fas " + (pct > 0 ? "fa-caret-up" : "fa-caret-down"),
+                style: {fontSize: "0.875rem"}
+            })
+        ];
+    }
+
+    function usd(value) {
+        return "$" + value.toLocaleString("en-US", {
+            minimumFractionDigits: 2,
+            maximumFractionDigits: 2
+        });
+    }
+
+    // Portfolio chart styling, shared by every render
+    var CHART_AXIS_COLOR = "rgba(255,255,255,0.7)";
+
+    var CHART_BASE_LAYOUT = {
+        margin: {l: 10, r: 10, t: 0, b: 0},
+        showlegend: false,
+        plot_bgcolor: "rgba(0,0,0,0)",
+        paper_bgcolor: "rgba(0,0,0,0)"
+    };
+
+    var EMPTY_CHART = {
+        data: [],
+        layout: Object.assign({}, CHART_BASE_LAYOUT, {
+            font: {color: CHART_AXIS_COLOR},
+            xaxis: {
+                showgrid: false,
+                zeroline: false,
+                showline: true,
+                linecolor: "rgba(255,255,255,0.2)",
+                color: CHART_AXIS_COLOR
+            },
+            yaxis: {
+                showgrid: true,
+                gridcolor: "rgba(255,255,255,0.1)",
+                zeroline: false,
+                tickprefix: "$",
+                color: CHART_AXIS_COLOR
+            },
+            annotations: [{
+                text: "No portfolio data available yet",
+                xref: "paper", yref: "paper",
+                x: 0.5, y: 0.5,
+                showarrow: false,
+                font: {color: "white", size: 14}
+            }]
+        })
+    };
+
+    var PORTFOLIO_LAYOUT = Object.assign({}, CHART_BASE_LAYOUT, {
+        xaxis: {
+            showgrid: false,
+            zeroline: false,
+            showline: true,
+            linecolor: "rgba(255,255,255,0.2)",
+            tickformat: "%b %d",
+            tickfont: {size: 8},
+            color: CHART_AXIS_COLOR
+        },
+        yaxis: {
+            showgrid: true,
+            gridcolor: "rgba(255,255,255,0.1)",
+            zeroline: false,
+            tickprefix: "$",
+            tickfont: {size: 8},
+            color: CHART_AXIS_COLOR
+        },
+        hovermode: "x unified"
+    });
+
+    // Trade marker (color, symbol) per action, in trace order
+    var MARKER_STYLES = [
+        ["BUY", "#10B981", "triangle-up"],
+        ["SELL", "#EF4444", "triangle-down"],
+        ["RESET", "#6366F1", "circle"]
+    ];
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        ui: {
+            updateTime: function (n) {
+                var now = new Date().toLocaleTimeString("en-GB", {hour12: false});
+                return h("Span", {}, "Last Updated: " + now + " ");
+            },
+
+            // Stop the server-polling intervals while the tab is hidden. Driven
+            // by the clock tick, which stays enabled so it can resume them.
+            pauseWhenHidden: function (n, disabled) {
+                var hidden = document.hidden;
+                if (hidden === Boolean(disabled)) {
+                    return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+                }
+                return [hidden, hidden];
+            },
+
+            updateModeBadge: function (mode) {
+                if (mode === "live") {
+                    return ["live-badge", [
+                        h("I", {className: "fas fa-satellite-dish"}),
+                        h("Span", {}, "Live Trading")
+                    ]];
+                }
+                return ["test-badge", [
+                    h("I", {className: "fas fa-flask"}),
+                    h("Span", {}, "Test Mode")
+                ]];
+            },
+
+            // One strategy change updates the notes and both control groups
+            onStrategyChange: function (strategy) {
+                if (strategy === "fear_greed") {
+                    return [FEAR_GREED_NOTES, {display: "block"}, {display: "none"}];
+                }
+                return [DUAL_TRADE_NOTES, {display: "none"}, {display: "block"}];
+            },
+
+            // Daily/total return and average cost from the server-computed basis,
+            // with the vault figures repriced at the latest price
+            updateMetrics: function (frame, basis) {
+                var price = frame ? frame.price : null;
+                if (price === null || price === undefined) {
+                    var nu = window.dash_clientside.no_update;
+                    return [nu, nu, nu, nu, nu];
+                }
+                basis = basis || {};
+                var dpct = basis.daily, tpct = basis.total;
+
+                // The vault figures move with the live price; the backtest ones don't
+                var vault = basis.vault;
+                if (vault && vault.last_value !== null && vault.last_value !== undefined) {
+                    var value = vault.usdt + vault.btc * price;
+                    var init = vault.initial_value;
+                    dpct = vault.last_value > 0 ? ((value / vault.last_value) - 1) * 100 : 0;
+                    tpct = init && init > 0 ? ((value / init) - 1) * 100 : 0;
+                }
+
+                function metric(pct) {
+                    if (pct === null || pct === undefined) {
+                        return ["0.00%", "metric-value"];
+                    }
+                    return [pct.toFixed(2) + "%", "metric-value " + (pct >= 0 ? "positive" : "negative")];
+                }
+
+                var avg = basis.avg_cost;
+                var avgCost = "$" + (avg !== null && avg !== undefined ? avg : price).toFixed(2);
+                return metric(dpct).concat(metric(tpct), [avgCost]);
+            },
+
+            // Build the portfolio figure from the {t, v, markers} arrays the
+            // server stores after a strategy run
+            renderPortfolioChart: function (series) {
+                if (!series) {
+                    return EMPTY_CHART;
+                }
+                var data = [{
+                    type: "scattergl",
+                    mode: "lines",
+                    name: "Portfolio Value",
+                    x: series.t,
+                    y: series.v,
+                    line: {color: "#38BDF8", width: 2},
+                    hovertemplate: "Date: %{x}<br>Value: $%{y:.2f}<extra></extra>"
+                }];
+                var markers = series.markers || {};
+                MARKER_STYLES.forEach(function (style) {
+                    var action = style[0], points = markers[action];
+                    if (!points) {
+                        return;
+                    }
+                    data.push({
+                        type: "scattergl",
+                        mode: "markers",
+                        name: action,
+                        x: points.t,
+                        y: points.v,
+                        marker: {color: style[1], symbol: style[2], size: 8},
+                        hovertemplate: action + "<br>Date: %{x}<br>Value: $%{y:.2f}<extra></extra>"
+                    });
+                });
+                return {data: data, layout: PORTFOLIO_LAYOUT};
+            },
+
+            // Render the market section from the {price} frame pushed by the server
+            updateMarketData: function (frame) {
+                if (!frame) {
+                    return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+                }
+                var price = frame.price;
+                if (price === null || price === undefined) {
+                    return [
+                        [
+                            h("I", {className: "fas fa-circle", style: {color: "#EF4444"}}),
+                            h("Span", {style: {color: "#EF4444"}}, "Disconnected")
+                        ],
+                        h("Div", {}, "Error loading market data")
+                    ];
+                }
+                var status = price > 0
+                    ? [h("I", {className: "fas fa-circle"}), h("Span", {}, "Connected")]
+                    : [
+                        h("I", {className: "fas fa-circle", style: {color: "#F59E0B"}}),
+                        h("Span", {style: {color: "#F59E0B"}}, "Degraded")
+                    ];
+                // Placeholder demo values
+                var hourChange = 0.75, dayChange = -1.2, volume = 1234.56;
+                return [status, [
+                    dataItem(usd(price), "BTC-USDT"),
+                    dataItem(changeValue(hourChange), "1H CHANGE"),
+                    dataItem(changeValue(dayChange), "24H CHANGE"),
+                    dataItem(usd(volume), "VOLUME (USDT)")
+                ]];
+            }
+        }
+    });
+})();
@@ -1,11 +1,12 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
-import traceback
 import logging
-from dash import Output, Input, State, dcc, html, no_update
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dash import Output, Input, State, ClientsideFunction, dcc, html, no_update
 from dash.exceptions import PreventUpdate
-import plotly.graph_objects as go
 
 # Strategy and vault imports
 from strategies.fear_greed import run_backtest, get_live_trade_signal
@@ -18,147 +19,312 @@ from scripts.utils import (
     fetch_tradeogre_ticker,
     fetch_tradeogre_account,
     execute_live_trade,
-    fetch_fear_and_greed
+    fetch_fear_and_greed,
+    ticker_circuit_open
 )
+from scripts.cache import store_get, store_put
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for overlapping independent I/O inside a single callback
+_IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="callback-io")
+IO_TIMEOUT = 10
+
+def _reset_io_pool():
+    # Background callbacks run in forked processes, which inherit the pool
+    # object but not its worker threads; give the child a fresh pool.
+    global _IO_POOL
+    _IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="callback-io")
+
+os.register_at_fork(after_in_child=_reset_io_pool)
+
+# Last formatted wall-clock second, shared by the log timestamps
+_last_hms = [None, ""]
+
+def _now_hms():
+    """Current local time as HH:MM:SS, formatted at most once per second."""
+    now = int(time.time())
+    if now != _last_hms[0]:
+        _last_hms[1] = time.strftime("%H:%M:%S", time.localtime(now))
+        _last_hms[0] = now
+    return _last_hms[1]
+
+# Last decoded vault, shared by the read-only callbacks that fire together
+# whenever virtual-vault-store changes
+_vault_cache = {"key": None, "vault": None}
+_vault_cache_lock = threading.Lock()
+
+def _get_vault(ref):
+    """
+    Load the vault referenced by virtual-vault-store, reusing the last decode
+
+    The store only carries the key of a server-side payload, and every save
+    gets a fresh key, so the key alone identifies the revision. The returned
+    vault is shared: callers must treat it as read-only.
+
+    Returns:
+        VirtualVault or None if there is no vault or its payload has expired
+    """
+    key = ref.get("key") if ref else None
+    if not key:
+        return None
+    with _vault_cache_lock:
+        if _vault_cache["key"] == key:
+            return _vault_cache["vault"]
+    data = store_get(key)
+    if data is None:
+        return None
+    vault = VirtualVault.from_dict(data)
+    with _vault_cache_lock:
+        _vault_cache["key"], _vault_cache["vault"] = key, vault
+    return vault
+
+# (log-item, log-action) class names per trade action, for the trade log rows
+LOG_CLASSES = {
+    action: (f"log-item {action.lower()}", f"log-action {action.lower()}")
+    for action in ("BUY", "SELL", "RESET")
+}
+
+def _account_item(value, label, btc_value=None):
+    """Build one balance tile, with an optional USD value line."""
+    children = [
+        html.Div(className="account-value", children=value),
+        html.Div(className="account-label", children=label)
+    ]
+    if btc_value is not None:
+        children.append(html.Div(className="btc-value", children=btc_value))
+    return html.Div(className="account-item", children=children)
+
+def _trade_log(rows):
+    """
+    Wrap pre-rendered trade-log rows in a single Markdown node
+
+    Long backtests produce hundreds of rows; shipping them as one HTML
+    string avoids serializing and reconciling a Div/Span tree per row.
+    The rows are built here from numbers and fixed labels only.
+    """
+    return dcc.Markdown("\n".join(rows), dangerously_allow_html=True)
+
+# Longest line trace shipped to the browser; longer histories are downsampled
+MAX_CHART_POINTS = 1000
+
+# Actions drawn as trade markers on the portfolio chart; styled clientside
+MARKER_ACTIONS = ("BUY", "SELL", "RESET")
+
+def downsample_lttb(x, y, threshold):
+    """
+    Downsample a line with Largest-Triangle-Three-Buckets
+
+    Keeps the first and last points and, for every bucket in between, the
+    point forming the largest triangle with its neighbours, so peaks and
+    troughs survive while the payload drops to ``threshold`` points.
+
+    Args:
+        x (np.ndarray): X values (numeric or datetime64)
+        y (np.ndarray): Y values
+        threshold (int): Number of points to keep
+
+    Returns:
+        tuple: (x, y) downsampled arrays
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    if np.issubdtype(x.dtype, np.datetime64):
+        xs = x.view("i8").astype(np.float64)
+    else:
+        xs = x.astype(np.float64)
+    ys = y.astype(np.float64)
+
+    # threshold - 2 buckets spread over the interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+        else:
+            nxt = slice(n - 1, n)
+        avg_x, avg_y = xs[nxt].mean(), ys[nxt].mean()
+        area = np.abs(
+            (xs[a] - avg_x) * (ys[start:end] - ys[a])
+            - (xs[a] - xs[start:end]) * (avg_y - ys[a])
+        )
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+
+    return x[keep], y[keep]
+
 def register_callbacks(app):
     """Register all callbacks for the application"""
 
-    @app.callback(
+    # Pure-view updates run in the browser (assets/clientside.js)
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="updateTime"),
         Output("last-updated", "children"),
-        Input("interval-component", "n_intervals")
+        Input("interval-clock", "n_intervals")
     )
-    def update_time(n):
-        return html.Span(f"Last Updated: {datetime.now().strftime('%H:%M:%S')} ")
 
-    @app.callback(
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="pauseWhenHidden"),
+        Output("interval-market", "disabled"),
+        Output("interval-account", "disabled"),
+        Input("interval-clock", "n_intervals"),
+        State("interval-market", "disabled")
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="updateModeBadge"),
         Output("mode-badge", "className"),
         Output("mode-badge", "children"),
         Input("mode-toggle", "value")
     )
-    def update_mode_badge(mode):
-        if mode == "live":
-            return "live-badge", [
-                html.I(className="fas fa-satellite-dish"),
-                html.Span("Live Trading")
-            ]
-        return "test-badge", [
-            html.I(className="fas fa-flask"),
-            html.Span("Test Mode")
-        ]
 
-    @app.callback(
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="onStrategyChange"),
         Output("strategy-notes", "children"),
-        Input("strategy-type", "value")
-    )
-    def update_strategy_notes(strategy):
-        if strategy == "fear_greed":
-            return [
-                html.H4(
-                    style={"display": "flex", "alignItems": "center", "gap": "0.5rem"},
-                    children=[
-                        html.I(className="fas fa-lightbulb", style={"color": "#F59E0B"}),
-                        html.Span("Fear & Greed Strategy")
-                    ]
-                ),
-                html.Div(className="strategy-notes", children=[
-                    html.P("• Buy when Fear & Greed < 40 with 50% of USDT"),
-                    html.P("• Sell when Fear & Greed > 60 with 50% of BTC"),
-                    html.P("• Reset when BTC ≥ 0.011 to [USDT: 200, BTC: 0.0022]")
-                ])
-            ]
-        return [
-            html.H4(
-                style={"display": "flex", "alignItems": "center", "gap": "0.5rem"},
-                children=[
-                    html.I(className="fas fa-lightbulb", style={"color": "#F59E0B"}),
-                    html.Span("Dual-Trade Strategy")
-                ]
-            ),
-            html.Div(className="strategy-notes", children=[
-                html.P("• Buy when Fear & Greed < threshold at discount price"),
-                html.P("• Sell when Fear & Greed > threshold at premium price"),
-                html.P("• Never sell at a loss - always above average cost"),
-                html.P("• Reinvest profits based on reinvestment rate")
-            ])
-        ]
-
-    @app.callback(
         Output("fear-greed-controls", "style"),
         Output("dual-trade-controls", "style"),
         Input("strategy-type", "value")
     )
-    def toggle_strategy_controls(strategy):
-        if strategy == "fear_greed":
-            return {"display": "block"}, {"display": "none"}
-        return {"display": "none"}, {"display": "block"}
 
-    @app.callback(
+    # Market section renders in the browser from the price frame in last-price-store
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="updateMarketData"),
         Output("connection-status", "children"),
-        Input("interval-component", "n_intervals")
+        Output("market-data-grid", "children"),
+        Input("last-price-store", "data")
+    )
+
+    # Portfolio figure is built in the browser from the series the strategy run stores
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="renderPortfolioChart"),
+        Output("portfolio-chart", "figure"),
+        Input("portfolio-chart-store", "data")
+    )
+
+    # Metrics reprice the basis at the latest price in the browser
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="updateMetrics"),
+        Output("metric-daily-return", "children"),
+        Output("metric-daily-return", "className"),
+        Output("metric-unrealized-return", "children"),
+        Output("metric-unrealized-return", "className"),
+        Output("metric-avg-cost", "children"),
+        Input("last-price-store", "data"),
+        Input("perf-metrics-store", "data")
     )
-    def update_connection_status(n):
+
+    @app.callback(
+        Output("last-price-store", "data"),
+        Input("interval-market", "n_intervals"),
+        State("last-price-store", "data")
+    )
+    def refresh_market(n, last_frame):
+        """Market tier: one ticker fetch per tick, pushed only when the price moves."""
         try:
             price = fetch_tradeogre_ticker("BTC-USDT")
-            if price > 0:
-                return [
-                    html.I(className="fas fa-circle"),
-                    html.Span("Connected")
-                ]
-            return [
-                html.I(className="fas fa-circle", style={"color": "#F59E0B"}),
-                html.Span("Degraded", style={"color": "#F59E0B"})
-            ]
-        except Exception:
-            return [
-                html.I(className="fas fa-circle", style={"color": "#EF4444"}),
-                html.Span("Disconnected", style={"color": "#EF4444"})
-            ]
+        except Exception as e:
+            logger.error(f"Error in refresh_market: {e}", exc_info=True)
+            price = None
+
+        if not price and ticker_circuit_open():
+            # Exchange is down and being skipped: show Disconnected
+            price = None
+
+        if last_frame and price == last_frame.get("price"):
+            raise PreventUpdate
+        return {"price": price}
 
     @app.callback(
-        Output("market-data-grid", "children"),
-        Input("interval-component", "n_intervals")
+        Output("account-info", "children"),
+        Input("interval-account", "n_intervals"),
+        Input("mode-toggle", "value"),
+        Input("virtual-vault-store", "data"),
+        State("last-price-store", "data"),
+        State("perf-metrics-store", "data")
     )
-    def update_market_data(n):
+    def refresh_account(n, mode, trade_result, frame, basis):
+        """Account tier: live balances are polled on their own interval and after each trade."""
+        if mode != "live":
+            # Test mode is rendered by refresh_test_account
+            raise PreventUpdate
+        # Price moves don't trigger a balance poll; read the latest one. Before
+        # the market tier's first push, fall back to the (cached) ticker.
+        price = frame.get("price") if frame else (fetch_tradeogre_ticker("BTC-USDT") or None)
+
         try:
-            price = fetch_tradeogre_ticker("BTC-USDT")
-            # Placeholder demo values
-            hour_change, day_change = 0.75, -1.2
-            volume = 1234.56
-            hour_class = "positive" if hour_change > 0 else "negative"
-            hour_icon = "fa-caret-up" if hour_change > 0 else "fa-caret-down"
-            day_class = "positive" if day_change > 0 else "negative"
-            day_icon = "fa-caret-up" if day_change > 0 else "fa-caret-down"
-            return [
-                html.Div(className="data-item", children=[
-                    html.Div(className="data-value", children=f"${price:,.2f}"),
-                    html.Div(className="data-label", children="BTC-USDT")
-                ]),
-                html.Div(className="data-item", children=[
-                    html.Div(className="data-value", children=[
-                        html.Span(f"{abs(hour_change)}% ", className=hour_class),
-                        html.I(className=f"fas {hour_icon}", style={"fontSize": "0.875rem"})
-                    ]),
-                    html.Div(className="data-label", children="1H CHANGE")
-                ]),
-                html.Div(className="data-item", children=[
-                    html.Div(className="data-value", children=[
-                        html.Span(f"{abs(day_change)}% ", className=day_class),
-                        html.I(className=f"fas {day_icon}", style={"fontSize": "0.875rem"})
-                    ]),
-                    html.Div(className="data-label", children="24H CHANGE")
-                ]),
-                html.Div(className="data-item", children=[
-                    html.Div(className="data-value", children=f"${volume:,.2f}"),
-                    html.Div(className="data-label", children="VOLUME (USDT)")
-                ])
-            ]
+            balances = fetch_tradeogre_account()
         except Exception as e:
-            logger.error(f"Error in update_market_data: {e}")
-            logger.error(traceback.format_exc())
-            return html.Div("Error loading market data")
+            logger.error(f"Error in refresh_account: {e}", exc_info=True)
+            return html.Div("Error loading account info")
+        return account_info(price, balances, basis)
+
+    @app.callback(
+        Output("account-info", "children", allow_duplicate=True),
+        Input("mode-toggle", "value"),
+        Input("last-price-store", "data"),
+        Input("perf-metrics-store", "data"),
+        prevent_initial_call=True
+    )
+    def refresh_test_account(mode, frame, basis):
+        """Test-mode balances come from the vault basis; no exchange calls."""
+        if mode == "live" or not frame:
+            raise PreventUpdate
+        return account_info(frame.get("price"), None, basis)
+
+    @app.callback(
+        Output("perf-metrics-store", "data"),
+        Input("backtest-store", "data"),
+        Input("virtual-vault-store", "data")
+    )
+    def update_performance_basis(backtest_data, vault_data):
+        """
+        Reduce the backtest/vault stores to the few numbers the metrics need.
+
+        Runs only when a store changes, so the per-tick path never rebuilds a
+        DataFrame or a VirtualVault; it just reprices the vault figures.
+        """
+        try:
+            basis = {"daily": None, "total": None, "avg_cost": None, "vault": None}
+
+            # Backtest-based metrics
+            # The store only carries a key; the DataFrame itself stays server-side
+            df = store_get(backtest_data.get("key")) if backtest_data else None
+            if df is not None and len(df) > 1:
+                values = df["portfolio_value"].to_numpy()
+                latest, prev, init = values[-1], values[-2], values[0]
+                if prev > 0:
+                    basis["daily"] = float(((latest / prev) - 1) * 100)
+                if init > 0:
+                    basis["total"] = float(((latest / init) - 1) * 100)
+                buy_prices = df["price"].to_numpy()[df["action"].to_numpy() == "BUY"]
+                if len(buy_prices) > 0:
+                    basis["avg_cost"] = float(buy_prices.mean())
+
+            # Virtual-vault–based metrics override
+            vault = _get_vault(vault_data)
+            if vault is not None:
+                basis["vault"] = {
+                    "btc": vault.btc_balance,
+                    "usdt": vault.usdt_balance,
+                    "last_value": vault.get_last_portfolio_value(),
+                    "initial_value": vault.initial_portfolio_value
+                }
+
+                avg_price = vault.get_average_buy_price()
+                if avg_price > 0:
+                    basis["avg_cost"] = avg_price
+
+            return basis
+
+        except Exception as e:
+            logger.error(f"Error updating performance basis: {e}", exc_info=True)
+            return None
 
     # New callback for trade account info
     @app.callback(
@@ -168,235 +334,92 @@ def register_callbacks(app):
     def update_trade_account(vault_data):
         """Display test-mode vault balances in 'Trade Account' card."""
         try:
-            if vault_data:
-                vault = VirtualVault.from_dict(vault_data)
+            vault = _get_vault(vault_data)
+            if vault is not None:
                 usdt, btc = vault.usdt_balance, vault.btc_balance
             else:
                 usdt, btc = 100, 0.001
             return [
-                html.Div(className="account-item", children=[
-                    html.Div(className="account-value", children=f"{btc:.8f}"),
-                    html.Div(className="account-label", children="BTC AVAILABLE")
-                ]),
-                html.Div(className="account-item", children=[
-                    html.Div(className="account-value", children=f"${usdt:.2f}"),
-                    html.Div(className="account-label", children="USDT AVAILABLE")
-                ])
+                _account_item(f"{btc:.8f}", "BTC AVAILABLE"),
+                _account_item(f"${usdt:.2f}", "USDT AVAILABLE")
             ]
         except Exception as e:
-            logger.error(f"Error in update_trade_account: {e}")
-            logger.error(traceback.format_exc())
+            logger.error(f"Error in update_trade_account: {e}", exc_info=True)
             return html.Div("Error loading trade account info")
             
-    @app.callback(
-        Output("account-info", "children"),
-        Input("interval-component", "n_intervals"),
-        Input("mode-toggle", "value"),
-        Input("virtual-vault-store", "data")
-    )
-    def update_account_info(n, mode, vault_data):
+    def account_info(price, balances, basis):
+        """Balance tiles for the live account or the virtual vault."""
         try:
-            if mode == "live":
-                balances = fetch_tradeogre_account()
+            vault = basis.get("vault") if basis else None
+            if balances is not None:
                 usdt = float(balances.get("USDT", 0))
                 btc = float(balances.get("BTC", 0))
+            elif vault is not None:
+                usdt, btc = vault["usdt"], vault["btc"]
             else:
-                if vault_data:
-                    vault = VirtualVault.from_dict(vault_data)
-                    usdt, btc = vault.usdt_balance, vault.btc_balance
-                else:
-                    usdt, btc = 100, 0.001
-            price = fetch_tradeogre_ticker("BTC-USDT")
-            btc_value = btc * price
+                usdt, btc = 100, 0.001
+            # Without a price, show the balances and leave out the USD value
+            btc_value = f"(${btc * price:.2f})" if price is not None else None
             logger.info(f"Account balances - BTC: {btc:.8f}, USDT: ${usdt:.2f}")
             return [
-                html.Div(className="account-item", children=[
-                    html.Div(className="account-value", children=f"{btc:.8f}"),
-                    html.Div(className="account-label", children="BTC BALANCE"),
-                    html.Div(className="btc-value", children=f"(${btc_value:.2f})")
-                ]),
-                html.Div(className="account-item", children=[
-                    html.Div(className="account-value", children=f"${usdt:.2f}"),
-                    html.Div(className="account-label", children="USDT BALANCE")
-                ])
+                _account_item(f"{btc:.8f}", "BTC BALANCE", btc_value),
+                _account_item(f"${usdt:.2f}", "USDT BALANCE")
             ]
         except Exception as e:
-            logger.error(f"Error in update_account_info: {e}")
-            logger.error(traceback.format_exc())
+            logger.error(f"Error in account_info: {e}", exc_info=True)
             return html.Div("Error loading account info")
 
-    @app.callback(
-        Output("metric-daily-return", "children"),
-        Output("metric-daily-return", "className"),
-        Output("metric-unrealized-return", "children"),
-        Output("metric-unrealized-return", "className"),
-        Output("metric-avg-cost", "children"),
-        Input("backtest-store", "data"),
-        Input("virtual-vault-store", "data"),
-        Input("interval-component", "n_intervals")
-    )
-    def update_performance_metrics(backtest_data, vault_data, n):
-        try:
-            price = fetch_tradeogre_ticker("BTC-USDT")
-            daily_return, daily_cls = "0.00%", "metric-value"
-            unreal_return, unreal_cls = "0.00%", "metric-value"
-            avg_cost = f"${price:.2f}"
-
-            # Backtest-based metrics
-            if backtest_data:
-                df = pd.DataFrame(backtest_data)
-                if len(df) > 1:
-                    latest, prev = df["portfolio_value"].iloc[-1], df["portfolio_value"].iloc[-2]
-                    if prev > 0:
-                        dpct = ((latest / prev) - 1) * 100
-                        daily_return = f"{dpct:.2f}%"
-                        daily_cls = f"metric-value {'positive' if dpct >= 0 else 'negative'}"
-                    init = df["portfolio_value"].iloc[0]
-                    if init > 0:
-                        tpct = ((latest / init) - 1) * 100
-                        unreal_return = f"{tpct:.2f}%"
-                        unreal_cls = f"metric-value {'positive' if tpct >= 0 else 'negative'}"
-                    buys = df[df["action"] == "BUY"]
-                    if len(buys) > 0:
-                        avg_cost = f"${buys['price'].mean():.2f}"
+    def portfolio_chart_data(df):
+        """
+        Reduce backtest or vault history to the arrays the chart needs
 
-            # Virtual-vault–based metrics override
-            if vault_data:
-                vault = VirtualVault.from_dict(vault_data)
-
-                # daily & total return
-                hist = vault.get_portfolio_history_df(price)
-                if len(hist) > 1:
-                    dpct = hist["daily_return"].iloc[-1]
-                    daily_return = f"{dpct:.2f}%"
-                    daily_cls = f"metric-value {'positive' if dpct >= 0 else 'negative'}"
-                    tpct = hist["total_return"].iloc[-1]
-                    unreal_return = f"{tpct:.2f}%"
-                    unreal_cls = f"metric-value {'positive' if tpct >= 0 else 'negative'}"
-
-                # Guard against missing 'action' column on vault history
-                trade_df = vault.get_trade_history_df()
-                if "action" in trade_df.columns:
-                    buy_trades = trade_df[trade_df["action"] == "BUY"]
-                    if len(buy_trades) > 0:
-                        avg_price = (buy_trades["price"] * buy_trades["btc_amount"]).sum() / buy_trades["btc_amount"].sum()
-                        avg_cost = f"${avg_price:.2f}"
-
-            return daily_return, daily_cls, unreal_return, unreal_cls, avg_cost
-
-        except Exception as e:
-            logger.error(f"Error updating performance metrics: {e}")
-            logger.error(traceback.format_exc())
-            return "0.00%", "metric-value", "0.00%", "metric-value", "$0.00"
-
-    def create_default_figure():
-        """Create a default chart styled for dark theme."""
-        fig = go.Figure()
-        fig.update_layout(
-            margin=dict(l=10, r=10, t=0, b=0),
-            showlegend=False,
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            font=dict(color="rgba(255,255,255,0.7)"),
-            xaxis=dict(
-                showgrid=False,
-                zeroline=False,
-                showline=True,
-                linecolor="rgba(255,255,255,0.2)",
-                color="rgba(255,255,255,0.7)"
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor="rgba(255,255,255,0.1)",
-                zeroline=False,
-                tickprefix="$",
-                color="rgba(255,255,255,0.7)"
-            ),
-            annotations=[dict(
-                text="No portfolio data available yet",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5,
-                showarrow=False,
-                font=dict(color="white", size=14)
-            )]
-        )
-        return fig
+        The figure itself (traces, styling, layout) is assembled in the
+        browser by ui.renderPortfolioChart, so only numbers cross the wire.
 
-    def create_portfolio_chart(df, additional_markers=None):
-        """Create a portfolio-value chart from backtest or vault history."""
+        Returns:
+            dict: {"t": [...], "v": [...], "markers": {action: {"t", "v"}}},
+            or None when the history can't be charted
+        """
         try:
             logger.info(f"Creating portfolio chart with {len(df)} data points")
             required = ["date", "portfolio_value", "action"]
             for col in required:
                 if col not in df.columns:
                     logger.error(f"Missing required column: {col}")
-                    return create_default_figure()
-
-            if isinstance(df["date"].iloc[0], str):
-                df["date"] = pd.to_datetime(df["date"])
-
-            fig = go.Figure()
-            # main line
-            fig.add_trace(go.Scatter(
-                x=df["date"],
-                y=df["portfolio_value"],
-                mode="lines",
-                name="Portfolio Value",
-                line=dict(color="#38BDF8", width=2),
-                hovertemplate="Date: %{x}<br>Value: $%{y:.2f}<extra></extra>"
-            ))
-            # markers
-            actions = {
-                "BUY": {"color": "#10B981", "symbol": "triangle-up"},
-                "SELL": {"color": "#EF4444", "symbol": "triangle-down"},
-                "RESET": {"color": "#6366F1", "symbol": "circle"}
-            }
-            for act, style in actions.items():
-                df_a = df[df["action"] == act]
-                if not df_a.empty:
-                    fig.add_trace(go.Scatter(
-                        x=df_a["date"],
-                        y=df_a["portfolio_value"],
-                        mode="markers",
-                        name=act,
-                        marker=dict(color=style["color"], size=8, symbol=style["symbol"]),
-                        hovertemplate="%{text}<br>Date: %{x}<br>Value: $%{y:.2f}<extra></extra>",
-                        text=[act] * len(df_a)
-                    ))
-            if additional_markers:
-                for m in additional_markers:
-                    fig.add_trace(m)
-
-            fig.update_layout(
-                margin=dict(l=10, r=10, t=0, b=0),
-                showlegend=False,
-                plot_bgcolor="rgba(0,0,0,0)",
-                paper_bgcolor="rgba(0,0,0,0)",
-                xaxis=dict(
-                    showgrid=False,
-                    zeroline=False,
-                    showline=True,
-                    linecolor="rgba(255,255,255,0.2)",
-                    tickformat="%b %d",
-                    tickfont=dict(size=8),
-                    color="rgba(255,255,255,0.7)"
-                ),
-                yaxis=dict(
-                    showgrid=True,
-                    gridcolor="rgba(255,255,255,0.1)",
-                    zeroline=False,
-                    tickprefix="$",
-                    tickfont=dict(size=8),
-                    color="rgba(255,255,255,0.7)"
-                ),
-                hovermode="x unified"
-            )
-            return fig
+                    return None
+
+            # Parse once (strings or date objects) so LTTB gets datetime64
+            if not pd.api.types.is_datetime64_any_dtype(df["date"]):
+                df["date"] = pd.to_datetime(df["date"], cache=True)
+
+            # Pull each column out as a NumPy array once; line and markers slice these
+            dates = df["date"].to_numpy()
+            values = df["portfolio_value"].to_numpy(dtype=np.float64)
+            action_col = df["action"].to_numpy()
+
+            def series(x, y):
+                # Second-resolution ISO dates and cent-rounded values keep the JSON small
+                return {
+                    "t": np.datetime_as_string(x, unit="s").tolist(),
+                    "v": np.round(y, 2).tolist()
+                }
+
+            # main line, downsampled so long histories stay cheap to ship and draw
+            data = series(*downsample_lttb(dates, values, MAX_CHART_POINTS))
+            data["markers"] = {}
+            mask = np.isin(action_col, MARKER_ACTIONS)
+            if mask.any():
+                marker_actions = action_col[mask]
+                marker_x, marker_y = dates[mask], values[mask]
+                for action in MARKER_ACTIONS:
+                    sel = marker_actions == action
+                    if sel.any():
+                        data["markers"][action] = series(marker_x[sel], marker_y[sel])
+            return data
 
         except Exception as e:
-            logger.error(f"Error creating portfolio chart: {e}")
-            logger.error(traceback.format_exc())
-            return create_default_figure()
+            logger.error(f"Error creating portfolio chart: {e}", exc_info=True)
+            return None
 
     @app.callback(
         Output("backtest-store", "data"),
@@ -404,7 +427,7 @@ def register_callbacks(app):
         Output("trade-log", "children"),
         Output("vault-value", "children"),
         Output("vault-value-btc", "children"),
-        Output("portfolio-chart", "figure"),
+        Output("portfolio-chart-store", "data"),
         Input("btn-execute", "n_clicks"),
         State("mode-toggle", "value"),
         State("strategy-type", "value"),
@@ -424,10 +447,13 @@ def register_callbacks(app):
         State("dual-input-greed", "value"),
         # Virtual vault state
         State("virtual-vault-store", "data"),
+        background=True,
+        running=[(Output("btn-execute", "disabled"), True, False)],
+        progress=Output("trade-log", "children"),
         prevent_initial_call=True
     )
     def execute_strategy(
-        n_clicks, mode, strategy_type,
+        set_progress, n_clicks, mode, strategy_type,
         usdt, btc, fear, greed,
         base_btc, usdc_reserve, buy_discount, sell_premium, reinvest_rate,
         dual_fear, dual_greed,
@@ -437,15 +463,29 @@ def register_callbacks(app):
         if not n_clicks:
             raise PreventUpdate
 
+        # Show the run has started while the worker fetches and backtests
+        set_progress(html.Div(className="log-item", children=[
+            html.Span(_now_hms(), className="log-timestamp"),
+            html.Span("RUNNING", className="log-action"),
+            html.Span(" - Checking live signal" if mode == "live" else " - Running backtest")
+        ]))
+
         try:
-            btc_price = fetch_tradeogre_ticker("BTC-USDT")
-            if vault_data:
-                vault = VirtualVault.from_dict(vault_data)
+            price_future = _IO_POOL.submit(fetch_tradeogre_ticker, "BTC-USDT")
+            fg_future = None
+            if strategy_type != "fear_greed" and mode == "live":
+                fg_future = _IO_POOL.submit(fetch_fear_and_greed)
+
+            # The store only carries a key; the vault itself stays server-side
+            vault_payload = store_get(vault_data.get("key")) if vault_data else None
+            if vault_payload:
+                vault = VirtualVault.from_dict(vault_payload)
             else:
                 vault = VirtualVault(
                     initial_btc=(btc if strategy_type == "fear_greed" else base_btc),
                     initial_usdt=(usdt if strategy_type == "fear_greed" else usdc_reserve)
                 )
+            btc_price = price_future.result(timeout=IO_TIMEOUT)
 
             # ─── Fear & Greed Strategy ─────────────────────────────────────────────
             if strategy_type == "fear_greed":
@@ -454,10 +494,11 @@ def register_callbacks(app):
                     action, amount = get_live_trade_signal(None, vault.usdt_balance, vault.btc_balance, fear, greed)
                     if action != "HOLD":
                         result = execute_live_trade(action, amount, price=btc_price)
-                        ts = datetime.now().strftime("%H:%M:%S")
+                        ts = _now_hms()
                         cls = action.lower()
                         if result.get("success"):
-                            vault.execute_trade(action, amount, btc_price)
+                            # The chart refresh below records this bar
+                            vault.execute_trade(action, amount, btc_price, record_portfolio=False)
                             log_item = html.Div(className=f"log-item {cls}", children=[
                                 html.Span(ts, className="log-timestamp"),
                                 html.Span(action, className=f"log-action {cls}"),
@@ -469,52 +510,54 @@ def register_callbacks(app):
                                 html.Span("ERROR", className="log-action"),
                                 html.Span(f" {result.get('error','unknown')}")
                             ])
-                        fig = create_portfolio_chart(vault.get_portfolio_history_df(btc_price))
+                        chart = portfolio_chart_data(vault.get_portfolio_history_df(btc_price))
                     else:
-                        ts = datetime.now().strftime("%H:%M:%S")
+                        ts = _now_hms()
                         log_item = html.Div(className="log-item", children=[
                             html.Span(ts, className="log-timestamp"),
                             html.Span("HOLD", className="log-action"),
                             html.Span(" - No trade signal generated")
                         ])
-                        fig = no_update
+                        chart = no_update
 
                     vault_val = vault.get_total_value_usd(btc_price)
                     return (
                         no_update,
-                        vault.to_dict(),
+                        {"key": store_put(vault.to_dict())},
                         log_item,
                         f"${vault_val:.2f}",
                         f"{vault.btc_balance:.8f} BTC",
-                        fig
+                        chart
                     )
 
                 # ─── Backtest mode ────────────────────────────────────────────────────
                 else:
                     logger.info(f"Backtest F&G: USDT={usdt}, BTC={btc}, Fear={fear}, Greed={greed}")
                     df = run_backtest(start_usdc=usdt, start_btc=btc, fg_fear=fear, fg_greed=greed)
-                    fig = create_portfolio_chart(df)
-                    trades = df[df["action"] != "HOLD"].sort_values("date", ascending=False)
-                    logs = []
-                    for _, r in trades.iterrows():
-                        date_str = (r["date"].strftime("%Y-%m-%d")
-                                    if isinstance(r["date"], pd.Timestamp) else r["date"])
-                        cls = r["action"].lower()
-                        logs.append(html.Div(className=f"log-item {cls}", children=[
-                            html.Span(date_str, className="log-timestamp"),
-                            html.Span(r["action"], className=f"log-action {cls}"),
-                            html.Span(f" @ ${r['price']:.2f} | USDT: ${r['usdc_after']:.2f} | BTC: {r['btc_after']:.8f}")
-                        ]))
+                    chart = portfolio_chart_data(df)
+                    # Backtest rows come out in date order; newest first is a reversal
+                    trades = df[df["action"] != "HOLD"].iloc[::-1]
+                    date_strs = trades["date"].dt.strftime("%Y-%m-%d").to_numpy()
+                    logs = [
+                        f'<div class="{LOG_CLASSES[action][0]}">'
+                        f'<span class="log-timestamp">{date_str}</span>'
+                        f'<span class="{LOG_CLASSES[action][1]}">{action}</span>'
+                        f'<span> @ ${price:.2f} | USDT: ${usdc_after:.2f} | BTC: {btc_after:.8f}</span></div>'
+                        for date_str, action, price, usdc_after, btc_after in zip(
+                            date_strs, trades["action"].to_numpy(), trades["price"].to_numpy(),
+                            trades["usdc_after"].to_numpy(), trades["btc_after"].to_numpy()
+                        )
+                    ]
                     latest = df.iloc[-1]
                     vault.reset(latest["btc_after"], latest["usdc_after"])
                     vault.update_market_price(btc_price)
                     return (
-                        df.to_dict("records"),
-                        vault.to_dict(),
-                        html.Div(logs),
+                        {"key": store_put(df)},
+                        {"key": store_put(vault.to_dict())},
+                        _trade_log(logs),
                         f"${latest['portfolio_value']:.2f}",
                         f"{latest['btc_after']:.8f} BTC",
-                        fig
+                        chart
                     )
 
             # ─── Dual-Trade Strategy with F&G Integration ───────────────────────────
@@ -529,15 +572,15 @@ def register_callbacks(app):
             if mode == "live":
                 logger.info("Live Dual-Trade with F&G Integration")
                 # Get current Fear & Greed value
-                fg_value = fetch_fear_and_greed()
-                ts = datetime.now().strftime("%H:%M:%S")
+                fg_value = fg_future.result(timeout=IO_TIMEOUT)
+                ts = _now_hms()
                 cls = "hold"
                 log_item = html.Div(className="log-item", children=[
                     html.Span(ts, className="log-timestamp"),
                     html.Span("HOLD", className="log-action"),
                     html.Span(" - No conditions met")
                 ])
-                fig = no_update
+                chart = no_update
 
                 # Generate buy and sell orders
                 buy_order, sell_order = strategy.generate_orders(btc_price)
@@ -547,7 +590,7 @@ def register_callbacks(app):
                     result = execute_live_trade("BUY", buy_order['btc_amount'], price=buy_order['price'])
                     cls = "buy" if result.get("success") else "error"
                     if result.get("success"):
-                        vault.execute_trade("BUY", buy_order['btc_amount'], buy_order['price'])
+                        vault.execute_trade("BUY", buy_order['btc_amount'], buy_order['price'], record_portfolio=False)
                         log_item = html.Div(className=f"log-item {cls}", children=[
                             html.Span(ts, className="log-timestamp"),
                             html.Span("BUY", className=f"log-action {cls}"),
@@ -563,19 +606,14 @@ def register_callbacks(app):
                 # Only sell when sentiment is greedy and price is above average cost
                 elif fg_value is not None and fg_value > dual_greed:
                     # Calculate average cost from vault trade history
-                    avg_cost = 0
-                    trade_df = vault.get_trade_history_df()
-                    if "action" in trade_df.columns:
-                        buy_trades = trade_df[trade_df["action"] == "BUY"]
-                        if len(buy_trades) > 0:
-                            avg_cost = (buy_trades["price"] * buy_trades["btc_amount"]).sum() / buy_trades["btc_amount"].sum()
+                    avg_cost = vault.get_average_buy_price()
                     
                     # Only sell if price is above average cost
                     if sell_order['price'] > avg_cost and avg_cost > 0:
                         result = execute_live_trade("SELL", sell_order['btc_amount'], price=sell_order['price'])
                         cls = "sell" if result.get("success") else "error"
                         if result.get("success"):
-                            vault.execute_trade("SELL", sell_order['btc_amount'], sell_order['price'])
+                            vault.execute_trade("SELL", sell_order['btc_amount'], sell_order['price'], record_portfolio=False)
                             log_item = html.Div(className=f"log-item {cls}", children=[
                                 html.Span(ts, className="log-timestamp"),
                                 html.Span("SELL", className=f"log-action {cls}"),
@@ -605,49 +643,50 @@ def register_callbacks(app):
                 
                 # Update chart if trade executed
                 if cls in ("buy", "sell"):
-                    fig = create_portfolio_chart(vault.get_portfolio_history_df(btc_price))
+                    chart = portfolio_chart_data(vault.get_portfolio_history_df(btc_price))
 
                 vault_val = vault.get_total_value_usd(btc_price)
                 return (
                     no_update,
-                    vault.to_dict(),
+                    {"key": store_put(vault.to_dict())},
                     log_item,
                     f"${vault_val:.2f}",
                     f"{vault.btc_balance:.8f} BTC",
-                    fig
+                    chart
                 )
 
             # ─── Dual Trade Backtest ──────────────────────────────────────────────
             logger.info("Backtest Dual-Trade")
             results_df, final_btc, final_usdt = strategy.run_backtest(initial_price=btc_price)
-            fig = create_portfolio_chart(results_df)
-            trades = results_df[results_df["action"].isin(["BUY", "SELL"])].sort_values("date", ascending=False)
-            logs = []
-            for _, r in trades.iterrows():
-                date_str = r["date"].strftime("%Y-%m-%d")
-                cls = r["action"].lower()
-                logs.append(html.Div(className=f"log-item {cls}", children=[
-                    html.Span(date_str, className="log-timestamp"),
-                    html.Span(r["action"], className=f"log-action {cls}"),
-                    html.Span(f" @ ${r['price']:.2f} | Portfolio: ${r['portfolio_value']:.2f}")
-                ]))
+            chart = portfolio_chart_data(results_df)
+            trades = results_df[results_df["action"].isin(["BUY", "SELL"])].iloc[::-1]
+            date_strs = trades["date"].dt.strftime("%Y-%m-%d").to_numpy()
+            logs = [
+                f'<div class="{LOG_CLASSES[action][0]}">'
+                f'<span class="log-timestamp">{date_str}</span>'
+                f'<span class="{LOG_CLASSES[action][1]}">{action}</span>'
+                f'<span> @ ${price:.2f} | Portfolio: ${portfolio_value:.2f}</span></div>'
+                for date_str, action, price, portfolio_value in zip(
+                    date_strs, trades["action"].to_numpy(), trades["price"].to_numpy(),
+                    trades["portfolio_value"].to_numpy()
+                )
+            ]
             final_val = results_df["portfolio_value"].iloc[-1]
             vault.reset(final_btc, final_usdt)
             vault.update_market_price(btc_price)
             return (
-                results_df.to_dict("records"),
-                vault.to_dict(),
-                html.Div(logs),
+                {"key": store_put(results_df)},
+                {"key": store_put(vault.to_dict())},
+                _trade_log(logs),
                 f"${final_val:.2f}",
                 f"{final_btc:.8f} BTC",
-                fig
+                chart
             )
 
         except Exception as e:
-            logger.error(f"Error executing strategy: {e}")
-            logger.error(traceback.format_exc())
+            logger.error(f"Error executing strategy: {e}", exc_info=True)
             error_log = html.Div(className="log-item error", children=[
-                html.Span(datetime.now().strftime("%H:%M:%S"), className="log-timestamp"),
+                html.Span(_now_hms(), className="log-timestamp"),
                 html.Span("ERROR", className="log-action"),
                 html.Span(f" {str(e)}")
             ])
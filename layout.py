@@ -14,9 +14,9 @@ colors = {
     'card_border': '#334155'  # Slate border
 }
 
-def create_layout(update_interval):
-    """Creates the main application layout"""
-    return html.Div(className="container", children=[
+def _static_children():
+    """Everything in the layout except the refresh intervals"""
+    return [
         # Header
         html.Div(className="header", children=[
             html.Div(className="logo", children=[
@@ -243,5 +243,19 @@ def create_layout(update_interval):
         dcc.Store(id="backtest-store"),
         dcc.Store(id="virtual-vault-store"),
         dcc.Store(id="initial-price-store"),
-        dcc.Interval(id="interval-component", interval=update_interval*1000, n_intervals=0)
+        dcc.Store(id="last-price-store"),
+        dcc.Store(id="perf-metrics-store"),
+        dcc.Store(id="portfolio-chart-store")
+    ]
+
+# The component tree is static; build it once at import and reuse it
+_STATIC_LAYOUT_CHILDREN = _static_children()
+
+def create_layout(update_interval, account_interval=None):
+    """Creates the main application layout"""
+    return html.Div(className="container", children=_STATIC_LAYOUT_CHILDREN + [
+        # Refresh tiers: the header clock, the ticker and metrics, live balances
+        dcc.Interval(id="interval-clock", interval=1000, n_intervals=0),
+        dcc.Interval(id="interval-market", interval=update_interval*1000, n_intervals=0),
+        dcc.Interval(id="interval-account", interval=(account_interval or update_interval)*1000, n_intervals=0)
     ])
\ No newline at end of file
@@ -0,0 +1,87 @@
+# scripts/backoff.py
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Backoff:
+    """
+    Circuit breaker with jittered exponential backoff for a failing upstream
+
+    The breaker starts CLOSED and lets every call through. After
+    ``threshold`` consecutive failures it goes OPEN: callers are told to
+    skip the upstream for a delay that doubles each time it re-opens
+    (``base`` up to ``cap`` seconds, +/- ``jitter``). Once the delay has
+    passed it goes HALF_OPEN and lets exactly one probe through; a success
+    closes it again, a failure re-opens it. Thread-safe, so every Dash
+    request thread shares one view of the upstream's health.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name, base=1.0, cap=30.0, jitter=0.2, threshold=1):
+        """
+        Args:
+            name (str): Upstream name, used in log messages
+            base (float): First delay in seconds
+            cap (float): Longest delay in seconds
+            jitter (float): Relative jitter applied to each delay
+            threshold (int): Consecutive failures before the breaker opens
+        """
+        self.name = name
+        self.base = base
+        self.cap = cap
+        self.jitter = jitter
+        self.threshold = threshold
+        self._state = self.CLOSED
+        self._failures = 0
+        self._delay = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """str: CLOSED, OPEN or HALF_OPEN"""
+        with self._lock:
+            return self._state
+
+    def ready(self):
+        """
+        Returns:
+            bool: True if the upstream may be called now. When the breaker
+            is due a probe, only the first caller gets True.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() >= self._retry_at:
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def success(self):
+        """Record a successful call and close the breaker"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"{self.name} recovered")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._delay = 0.0
+            self._retry_at = 0.0
+
+    def failure(self):
+        """Record a failed call, opening the breaker once past the threshold"""
+        with self._lock:
+            self._failures += 1
+            if self._state != self.HALF_OPEN and self._failures < self.threshold:
+                return
+            self._state = self.OPEN
+            self._delay = min(self.cap, self._delay * 2 if self._delay else self.base)
+            delay = self._delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+            self._retry_at = time.monotonic() + delay
+        logger.warning(f"{self.name} failed; backing off for {delay:.1f}s")
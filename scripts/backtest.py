@@ -1,55 +1,188 @@
+import functools
+import os
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from scripts.jit import njit, prange
 from scripts.utils import fetch_tradeogre_ticker
+from strategies._vault_kernels import BUY, SELL, RESET, ACTION_LABELS
 
-def generate_mock_data(days=365):
-    """Generate mock data for backtesting when no real data is available."""
-    end_date = datetime.now()
+# Fear & Greed classification bands, as upper bin edges for np.digitize
+FG_CLASS_EDGES = np.array([25, 40, 60, 80])
+FG_CLASS_LABELS = np.array(["Extreme Fear", "Fear", "Neutral", "Greed", "Extreme Greed"], dtype=object)
+
+# Shared generator for unseeded draws; set BACKTEST_SEED to make them repeatable
+_RNG_SEED = os.getenv("BACKTEST_SEED")
+_RNG = np.random.default_rng(None if _RNG_SEED is None else int(_RNG_SEED))
+
+def _reset_rng():
+    # Forked background workers inherit the generator state; without a fixed
+    # seed, give each child fresh entropy so they don't replay the same draws.
+    global _RNG
+    if _RNG_SEED is None:
+        _RNG = np.random.default_rng()
+
+os.register_at_fork(after_in_child=_reset_rng)
+
+# Kernel signatures, pinned so numba compiles (or loads from its on-disk
+# cache) at import instead of on the first backtest. Inputs are typed as
+# read-only so both pandas views and fresh arrays match.
+_F8_IN = "Array(float64, 1, 'A', readonly=True)"
+_STEP_SIG = "UniTuple(float64, 3)(float64, float64, float64, float64, float64, float64)"
+_KERNEL_SIG = (
+    f"Tuple((int8[:], float64[:], float64[:], float64[:], float64[:]))"
+    f"({_F8_IN}, {_F8_IN}, float64, float64, float64, float64)"
+)
+_SWEEP_SIG = f"float64[:]({_F8_IN}, {_F8_IN}, {_F8_IN}, {_F8_IN}, float64, float64)"
+
+@njit(_STEP_SIG, cache=True)
+def _strategy_step(price, fg_value, fg_fear, fg_greed, usdc_balance, btc_balance):
+    """
+    Apply one day of the Fear & Greed strategy
+    
+    Branchless: the F&G signal is close to random, so the buy/sell choice
+    is hard to predict. Each flag is 0.0 or 1.0 and the deltas are taken
+    from the pre-trade balances, matching the if/elif rules: buy with 50%
+    of USDC on fear, else sell 50% of BTC on greed, then reset the baseline
+    once BTC reaches the threshold.
+    
+    Returns:
+        tuple: (usdc_balance, btc_balance, action code)
+    """
+    buy = 1.0 * ((fg_value < fg_fear) & (usdc_balance > 0))
+    sell = 1.0 * ((fg_value > fg_greed) & (btc_balance > 0)) * (1.0 - buy)
+    d_usdc = -0.5 * usdc_balance * buy + 0.5 * btc_balance * price * sell
+    d_btc = (usdc_balance * 0.5) / price * buy - 0.5 * btc_balance * sell
+    usdc_balance += d_usdc
+    btc_balance += d_btc
+    code = BUY * buy + SELL * sell
+    
+    reset = 1.0 * (btc_balance >= 0.011)
+    usdc_balance = 200.0 * reset + usdc_balance * (1.0 - reset)
+    btc_balance = 0.0022 * reset + btc_balance * (1.0 - reset)
+    code = RESET * reset + code * (1.0 - reset)
+    return usdc_balance, btc_balance, code
+
+@njit(_KERNEL_SIG, cache=True)
+def _backtest_kernel(prices, fg_values, start_usdc, start_btc, fg_fear, fg_greed):
+    """
+    Day-by-day Fear & Greed strategy over price and index arrays
+    
+    The balances are path-dependent, so this stays a sequential loop; it
+    runs on plain arrays so numba can compile it.
+    
+    Portfolio value is left to the caller: it only depends on the pre-trade
+    balances, so it is one vector expression over the returned arrays.
+    
+    Returns:
+        tuple: (action, usdc_before, btc_before, usdc_after, btc_after) arrays
+    """
+    n = prices.shape[0]
+    action = np.empty(n, dtype=np.int8)
+    usdc_before = np.empty(n)
+    btc_before = np.empty(n)
+    usdc_after = np.empty(n)
+    btc_after = np.empty(n)
+    
+    usdc_balance = start_usdc
+    btc_balance = start_btc
+    
+    for i in range(n):
+        price = prices[i]
+        fg_value = fg_values[i]
+        
+        # Balances before any trades
+        usdc_before[i] = usdc_balance
+        btc_before[i] = btc_balance
+        
+        usdc_balance, btc_balance, code = _strategy_step(
+            price, fg_value, fg_fear, fg_greed, usdc_balance, btc_balance
+        )
+        
+        action[i] = np.int8(code)
+        usdc_after[i] = usdc_balance
+        btc_after[i] = btc_balance
+    
+    return action, usdc_before, btc_before, usdc_after, btc_after
+
+@njit(_SWEEP_SIG, parallel=True, cache=True)
+def _sweep_kernel(prices, fg_values, fears, greeds, start_usdc, start_btc):
+    """
+    Run the ``_backtest_kernel`` strategy for many threshold pairs at once
+    
+    Each (fear, greed) pair evolves its own portfolio over the same price
+    and index arrays; pairs are independent, so they run in parallel.
+    
+    Returns:
+        np.ndarray: Final portfolio value per pair, at the last price
+    """
+    n = prices.shape[0]
+    final = np.empty(fears.shape[0])
+    for p in prange(fears.shape[0]):
+        fg_fear = fears[p]
+        fg_greed = greeds[p]
+        usdc_balance = start_usdc
+        btc_balance = start_btc
+        for i in range(n):
+            usdc_balance, btc_balance, _ = _strategy_step(
+                prices[i], fg_values[i], fg_fear, fg_greed, usdc_balance, btc_balance
+            )
+        final[p] = usdc_balance + btc_balance * prices[n - 1]
+    return final
+
+def _mock_series(n, rng):
+    """Draw ``n`` days of mock prices and Fear & Greed values from ``rng``."""
+    # Generate prices with some realistic volatility
+    base_price = 30000  # Starting BTC price
+    # Random daily change between -5% and 5%, compounded in one pass
+    returns = rng.normal(0.0, 0.02, size=n - 1)
+    prices = np.empty(n)
+    prices[0] = base_price
+    np.cumprod(1.0 + returns, out=prices[1:])
+    prices[1:] *= base_price
+    
+    # Generate Fear & Greed values (0-100) that have some correlation with
+    # price changes: map each day's change to a fear/greed tendency, scaled
+    # for more dramatic effect, plus randomness
+    price_change = prices[1:] / prices[:-1] - 1
+    base_fg = 50 + price_change * 300
+    fg = np.empty(n)
+    fg[0] = rng.integers(30, 70)  # Initial value
+    fg[1:] = np.clip(base_fg + rng.normal(0, 10, size=len(base_fg)), 0, 100)
+    fg_values = fg.astype(np.int64)
+    
+    # Classification bands: [0, 25), [25, 40), [40, 60), [60, 80), [80, 100]
+    fg_classes = FG_CLASS_LABELS[np.digitize(fg, FG_CLASS_EDGES)]
+    
+    return prices, fg_values, fg_classes
+
+@functools.lru_cache(maxsize=16)
+def _seeded_mock_series(n, seed):
+    """Seeded draws are deterministic, so sweeps over one seed share them."""
+    series = _mock_series(n, np.random.default_rng(seed))
+    for arr in series:
+        arr.flags.writeable = False
+    return series
+
+def generate_mock_data(days=365, seed=None, end_date=None):
+    """
+    Generate mock data for backtesting when no real data is available.
+    
+    With a ``seed`` the price and Fear & Greed series are drawn once and
+    reused by later calls with the same ``days`` and ``seed``; without one
+    every call draws fresh data. ``end_date`` (default now) anchors the
+    dates, so runs sharing one anchor line up exactly.
+    """
+    end_date = end_date or datetime.now()
     start_date = end_date - timedelta(days=days)
     
     # Generate dates
     dates = pd.date_range(start=start_date, end=end_date, freq='D')
     
-    # Generate prices with some realistic volatility
-    base_price = 30000  # Starting BTC price
-    prices = [base_price]
-    for i in range(1, len(dates)):
-        # Random daily change between -5% and 5%
-        change = np.random.normal(0, 0.02)  
-        new_price = prices[-1] * (1 + change)
-        prices.append(new_price)
-    
-    # Generate Fear & Greed values (0-100)
-    fg_values = []
-    fg_classes = []
-    
-    fg_class_map = {
-        (0, 25): "Extreme Fear",
-        (25, 40): "Fear",
-        (40, 60): "Neutral",
-        (60, 80): "Greed",
-        (80, 101): "Extreme Greed"
-    }
-    
-    for i in range(len(dates)):
-        # Generate a value that has some correlation with price changes
-        if i > 0:
-            price_change = (prices[i] / prices[i-1]) - 1
-            # Map price change to a fear/greed tendency
-            base_fg = 50 + price_change * 300  # Scale for more dramatic effect
-            # Add randomness
-            fg = max(0, min(100, base_fg + np.random.normal(0, 10)))
-        else:
-            fg = np.random.randint(30, 70)  # Initial value
-        
-        fg_values.append(int(fg))
-        
-        # Determine classification
-        for (lower, upper), classification in fg_class_map.items():
-            if lower <= fg < upper:
-                fg_classes.append(classification)
-                break
+    if seed is None:
+        prices, fg_values, fg_classes = _mock_series(len(dates), _RNG)
+    else:
+        prices, fg_values, fg_classes = _seeded_mock_series(len(dates), seed)
     
     # Create DataFrame
     df = pd.DataFrame({
@@ -61,7 +194,7 @@ def generate_mock_data(days=365):
     
     return df
 
-def run_backtest(start_usdc=100, start_btc=0.0011, fg_fear=40, fg_greed=60):
+def run_backtest(start_usdc=100, start_btc=0.0011, fg_fear=40, fg_greed=60, seed=None, end_date=None):
     """
     Run a backtest of the trading strategy using historical or mock data.
     
@@ -70,67 +203,63 @@ def run_backtest(start_usdc=100, start_btc=0.0011, fg_fear=40, fg_greed=60):
     - start_btc: Initial BTC balance
     - fg_fear: Fear threshold (buy signal when F&G below this)
     - fg_greed: Greed threshold (sell signal when F&G above this)
+    - seed: Mock-data seed; runs sharing a seed reuse the same cached series
+    - end_date: Last backtest day (default now)
     
     Returns:
     - DataFrame with trade history and portfolio value
     """
     # Generate or load historical data
-    df = generate_mock_data(days=365)
+    df = generate_mock_data(days=365, seed=seed, end_date=end_date)
     
-    # Initialize portfolio and trade log
-    usdc_balance = start_usdc
-    btc_balance = start_btc
-    trade_log = []
+    prices = df['price'].to_numpy(dtype=np.float64)
+    action, usdc_before, btc_before, usdc_after, btc_after = _backtest_kernel(
+        prices,
+        df['fg_value'].to_numpy(dtype=np.float64),
+        float(start_usdc), float(start_btc), float(fg_fear), float(fg_greed)
+    )
+    # Portfolio value before each day's trade
+    portfolio_value = usdc_before + btc_before * prices
     
-    # Loop through each day
-    for idx, row in df.iterrows():
-        date = row['date']
-        price = row['price']
-        fg_value = row['fg_value']
-        
-        # Calculate current portfolio value in USD
-        portfolio_value = usdc_balance + (btc_balance * price)
-        
-        # Record for this day before any trades
-        action = "HOLD"
-        usdc_before = usdc_balance
-        btc_before = btc_balance
-        
-        # Apply trading strategy based on Fear & Greed index
-        if fg_value < fg_fear and usdc_balance > 0:  # Fear - Buy BTC
-            buy_amount_usdc = usdc_balance * 0.5  # Use 50% of USDC
-            btc_bought = buy_amount_usdc / price
-            btc_balance += btc_bought
-            usdc_balance -= buy_amount_usdc
-            action = "BUY"
-        elif fg_value > fg_greed and btc_balance > 0:  # Greed - Sell BTC
-            sell_amount_btc = btc_balance * 0.5  # Sell 50% of BTC
-            usdc_gained = sell_amount_btc * price
-            btc_balance -= sell_amount_btc
-            usdc_balance += usdc_gained
-            action = "SELL"
-        
-        # Reset baseline when reaching BTC threshold
-        if btc_balance >= 0.011:
-            usdc_balance = 200
-            btc_balance = 0.0022
-            action = "RESET"
-        
-        # Add to trade log
-        trade_log.append({
-            'date': date,
-            'price': price,
-            'fg_value': fg_value,
-            'fg_class': row['fg_class'],
-            'action': action,
-            'usdc_before': usdc_before,
-            'btc_before': btc_before,
-            'usdc_after': usdc_balance,
-            'btc_after': btc_balance,
-            'portfolio_value': portfolio_value
-        })
-    
-    return pd.DataFrame(trade_log)
+    # Compact dtypes: float32 balances, int16 index, categorical labels
+    return pd.DataFrame({
+        'date': df['date'],
+        'price': df['price'].to_numpy(dtype=np.float32),
+        'fg_value': df['fg_value'].to_numpy(dtype=np.int16),
+        'fg_class': pd.Categorical(df['fg_class'], categories=FG_CLASS_LABELS),
+        'action': pd.Categorical.from_codes(action, categories=ACTION_LABELS),
+        'usdc_before': usdc_before.astype(np.float32),
+        'btc_before': btc_before.astype(np.float32),
+        'usdc_after': usdc_after.astype(np.float32),
+        'btc_after': btc_after.astype(np.float32),
+        'portfolio_value': portfolio_value.astype(np.float32)
+    })
+
+def run_sweep(fears, greeds, start_usdc=100, start_btc=0.0011, seed=None):
+    """
+    Backtest many Fear & Greed threshold pairs over the same mock data.
+    
+    Parameters:
+    - fears: Fear thresholds, one per pair
+    - greeds: Greed thresholds, one per pair
+    - start_usdc: Initial USDC balance
+    - start_btc: Initial BTC balance
+    - seed: Mock-data seed (see generate_mock_data)
+    
+    Returns:
+    - np.ndarray of final portfolio values, one per (fear, greed) pair
+    """
+    fears = np.asarray(fears, dtype=np.float64)
+    greeds = np.asarray(greeds, dtype=np.float64)
+    if fears.shape != greeds.shape:
+        raise ValueError("fears and greeds must have the same length")
+    
+    df = generate_mock_data(days=365, seed=seed)
+    return _sweep_kernel(
+        df['price'].to_numpy(dtype=np.float64),
+        df['fg_value'].to_numpy(dtype=np.float64),
+        fears, greeds, float(start_usdc), float(start_btc)
+    )
 
 def get_live_trade_signal(fg_value, current_usdc, current_btc, fg_fear=40, fg_greed=60):
     """
@@ -142,7 +271,7 @@ def get_live_trade_signal(fg_value, current_usdc, current_btc, fg_fear=40, fg_gr
     """
     # If fg_value is None (e.g., API unavailable), generate a random value for demo
     if fg_value is None:
-        fg_value = np.random.randint(0, 100)
+        fg_value = int(_RNG.integers(0, 100))
     
     if fg_value < fg_fear and current_usdc > 0:
         return "BUY", current_usdc * 0.5
@@ -0,0 +1,293 @@
+# scripts/cache.py
+import functools
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import diskcache
+
+# How long server-side payloads outlive the browser session that wrote them
+STORE_TTL = 24 * 60 * 60
+
+_store = None
+_store_lock = threading.Lock()
+
+# Workers that refresh stale ``swr_cache`` entries off the request path
+_REFRESH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="swr-refresh")
+
+
+# Per-cache hooks that drop lock state inherited across a fork
+_FORK_RESETS = []
+
+
+def _reset_after_fork():
+    # Forked background workers inherit the pool object but not its threads,
+    # and may inherit cache locks held by a parent thread mid-fetch, which
+    # nothing in the child would ever release
+    global _REFRESH_POOL, _store, _store_lock
+    _REFRESH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="swr-refresh")
+    # Open the store afresh rather than reuse the parent's SQLite handle
+    _store = None
+    _store_lock = threading.Lock()
+    for reset in _FORK_RESETS:
+        reset()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _generation_key(func):
+    """Store key of a cached function's cross-process generation counter"""
+    return f"cache-generation:{func.__module__}.{func.__qualname__}"
+
+
+def _shared_generation(key):
+    # Held in the diskcache store, so a cache_clear in a background worker
+    # is seen by the server process (and vice versa)
+    return _get_store().get(key, default=0)
+
+
+def _bump_shared_generation(key):
+    return _get_store().incr(key, default=0)
+
+
+def ttl_cache(ttl):
+    """
+    Memoize a function for ``ttl`` seconds, keyed by its arguments
+
+    The cache is process-wide and guarded by a lock so concurrent Dash
+    request threads share a single upstream call per key: a caller that
+    misses while another call for the same key is in flight waits for it
+    instead of issuing its own. Falsy results (the fetchers return 0, {}
+    or None on error) are not cached, so a failed lookup is retried on
+    the next call.
+
+    ``cache_clear`` empties the cache in every process, not just the
+    caller's: it bumps a generation counter in the shared diskcache store,
+    which each process checks before serving. It also discards the result
+    of any call already in flight, so a value fetched before the clear is
+    never stored after it.
+
+    Args:
+        ttl (float): Time-to-live in seconds
+
+    Returns:
+        callable: Decorator
+    """
+    def decorator(func):
+        entries = {}
+        inflight = {}
+        lock = threading.Lock()
+        # Last shared generation this process has seen; results fetched
+        # under an older one are dropped
+        gen_key = _generation_key(func)
+        generation = 0
+
+        def sync(current):
+            # Under lock: a clear (here or in another process) moved the
+            # shared generation on, so everything cached is stale
+            nonlocal generation
+            if current != generation:
+                generation = current
+                entries.clear()
+                inflight.clear()
+
+        def lookup(key):
+            entry = entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                return entry
+            return None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            current = _shared_generation(gen_key)
+            with lock:
+                sync(current)
+                entry = lookup(key)
+                if entry is not None:
+                    return entry[1]
+                key_lock = inflight.setdefault(key, threading.Lock())
+
+            # One caller per key fetches; the rest wait and re-check the cache
+            with key_lock:
+                with lock:
+                    entry = lookup(key)
+                    started = generation
+                if entry is not None:
+                    return entry[1]
+
+                value = func(*args, **kwargs)
+                if value:
+                    current = _shared_generation(gen_key)
+                    with lock:
+                        sync(current)
+                        if started == generation:
+                            entries[key] = (time.monotonic(), value)
+                return value
+
+        def cache_clear():
+            current = _bump_shared_generation(gen_key)
+            with lock:
+                sync(current)
+
+        def reset_after_fork():
+            nonlocal lock
+            lock = threading.Lock()
+            inflight.clear()
+
+        _FORK_RESETS.append(reset_after_fork)
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+def swr_cache(max_age, stale):
+    """
+    Memoize a function with stale-while-revalidate semantics
+
+    Within ``max_age`` seconds the cached value is returned as-is. For the
+    following ``stale`` seconds the cached value is still returned at once,
+    and a single background refresh per key is scheduled. Only when
+    the entry is older than ``max_age + stale`` (or missing) does the caller
+    block on the upstream call, single-flight as in ``ttl_cache``. Falsy
+    results are not cached, so a failed refresh keeps serving the last
+    good value until it ages out. As with ``ttl_cache``, ``cache_clear``
+    applies to every process and also discards results of refreshes and
+    calls that started before it.
+
+    Args:
+        max_age (float): Seconds a value is served without refreshing
+        stale (float): Further seconds a value is served while refreshing
+
+    Returns:
+        callable: Decorator
+    """
+    def decorator(func):
+        entries = {}
+        inflight = {}
+        refreshing = set()
+        lock = threading.Lock()
+        # Last shared generation this process has seen (see ttl_cache)
+        gen_key = _generation_key(func)
+        generation = 0
+
+        def sync(current):
+            nonlocal generation
+            if current != generation:
+                generation = current
+                entries.clear()
+                inflight.clear()
+                refreshing.clear()
+
+        def store(key, value, started):
+            if value:
+                current = _shared_generation(gen_key)
+                with lock:
+                    sync(current)
+                    if started == generation:
+                        entries[key] = (time.monotonic(), value)
+
+        def refresh(key, args, kwargs, started):
+            try:
+                store(key, func(*args, **kwargs), started)
+            finally:
+                with lock:
+                    if started == generation:
+                        refreshing.discard(key)
+
+        def lookup(key):
+            # Returns (entry, age) or (None, None)
+            entry = entries.get(key)
+            if entry is None:
+                return None, None
+            return entry, time.monotonic() - entry[0]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            current = _shared_generation(gen_key)
+            with lock:
+                sync(current)
+                entry, age = lookup(key)
+                if entry is not None and age < max_age + stale:
+                    if age >= max_age and key not in refreshing:
+                        refreshing.add(key)
+                        _REFRESH_POOL.submit(refresh, key, args, kwargs, generation)
+                    return entry[1]
+                key_lock = inflight.setdefault(key, threading.Lock())
+
+            with key_lock:
+                with lock:
+                    entry, age = lookup(key)
+                    started = generation
+                if entry is not None and age < max_age + stale:
+                    return entry[1]
+
+                value = func(*args, **kwargs)
+                store(key, value, started)
+                return value
+
+        def cache_clear():
+            current = _bump_shared_generation(gen_key)
+            with lock:
+                sync(current)
+
+        def reset_after_fork():
+            # The parent's refresh threads don't exist here
+            nonlocal lock
+            lock = threading.Lock()
+            inflight.clear()
+            refreshing.clear()
+
+        _FORK_RESETS.append(reset_after_fork)
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+def _get_store():
+    """Open the server-side store on first use, under ``CACHE_DIR``"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            cache_dir = os.getenv("CACHE_DIR", ".dash-cache")
+            _store = diskcache.Cache(os.path.join(cache_dir, "store"))
+        return _store
+
+
+def store_put(value):
+    """
+    Keep a payload on the server and return the key to send to the browser
+
+    Backed by diskcache so background callback workers and the request
+    threads see the same entries.
+
+    Args:
+        value: Any picklable object (e.g. a backtest DataFrame)
+
+    Returns:
+        str: Key for ``store_get``
+    """
+    key = uuid.uuid4().hex
+    _get_store().set(key, value, expire=STORE_TTL)
+    return key
+
+
+def store_get(key):
+    """
+    Look up a payload saved with ``store_put``
+
+    Args:
+        key (str): Key returned by ``store_put``
+
+    Returns:
+        The stored object, or None if it is unknown or has expired
+    """
+    if not key:
+        return None
+    return _get_store().get(key)
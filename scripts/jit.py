@@ -0,0 +1,28 @@
+# scripts/jit.py
+"""
+Optional Numba JIT
+
+Numeric kernels are decorated with ``njit`` (and loop with ``prange``)
+from here. When numba is installed they are compiled to machine code;
+otherwise ``njit`` is a pass-through, ``prange`` is ``range``, and the same
+functions run as plain Python over NumPy arrays.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.info("numba not installed; numeric kernels will run uncompiled")
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit supporting both @njit and @njit(...)"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+    # Parallel loops simply run serially
+    prange = range
@@ -1,10 +1,15 @@
 # scripts/utils.py
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 import os
-import json
+import orjson
 from dotenv import load_dotenv
 
+from scripts.backoff import Backoff
+from scripts.cache import swr_cache, ttl_cache
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -16,6 +21,67 @@ TRADEOGRE_SECRET = os.getenv("TRADEOGRE_SECRET")
 # TradeOgre API base URL
 BASE_URL = "https://tradeogre.com/api/v1"
 
+# (connect, read) timeouts in seconds for every TradeOgre request, so a
+# stalled exchange can't pin a callback thread indefinitely
+REQUEST_TIMEOUT = (2, 5)
+
+def _new_session():
+    """Build the shared keep-alive session used for every TradeOgre call"""
+    session = requests.Session()
+    session.headers.update({
+        "Accept": "application/json",
+        "User-Agent": "CryptoTrader/1.0"
+    })
+    # Transient gateway errors and rate limits are retried with a short
+    # backoff. Retry's default allowed_methods leaves out POST, so orders
+    # are never resubmitted. Retry-After is ignored: an exchange asking for a
+    # long wait would otherwise sleep the callback thread for that long, and
+    # sustained throttling is the Backoff breaker's job.
+    retries = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[429, 502, 503, 504],
+        respect_retry_after_header=False
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# One pooled session so the callback threads reuse TCP/TLS connections
+# instead of paying a handshake on every poll
+_SESSION = _new_session()
+
+def _reset_session():
+    """Drop sockets inherited from the parent in forked background workers"""
+    global _SESSION
+    _SESSION = _new_session()
+
+os.register_at_fork(after_in_child=_reset_session)
+
+# Cache lifetimes (seconds). Every interval tick fans out to several callbacks
+# that all want the same ticker.
+TICKER_TTL = 2
+ORDERBOOK_TTL = 1
+ACCOUNT_TTL = 5
+
+# How much longer the ticker and balances may be served stale while a
+# background refresh runs, instead of blocking the callback on the exchange
+TICKER_SWR = 10
+ACCOUNT_SWR = 30
+
+# Stop hitting the ticker endpoint after three straight failures; probe it
+# again after a 5s cool-off, doubling up to 30s while it stays down
+_ticker_backoff = Backoff("TradeOgre ticker", base=5.0, cap=30.0, threshold=3)
+
+def ticker_circuit_open():
+    """
+    Returns:
+        bool: True while ticker calls are being skipped after repeated failures
+    """
+    return _ticker_backoff.state == Backoff.OPEN
+
+@swr_cache(TICKER_TTL, TICKER_SWR)
 def fetch_tradeogre_ticker(market_pair):
     """
     Fetch the current ticker price for a given market pair
@@ -24,22 +90,28 @@ def fetch_tradeogre_ticker(market_pair):
         market_pair (str): Market pair in format 'BTC-USDT'
         
     Returns:
-        float: Current price or 0 if error
+        float: Current price or 0 if error (or while the circuit is open)
     """
+    if not _ticker_backoff.ready():
+        return 0
     try:
         url = f"{BASE_URL}/ticker/{market_pair}"
-        response = requests.get(url)
-        data = response.json()
+        response = _SESSION.get(url, timeout=REQUEST_TIMEOUT)
+        data = orjson.loads(response.content)
         
         if data.get("success", False):
+            _ticker_backoff.success()
             return float(data.get("price", 0))
         else:
             logger.error(f"Error fetching ticker: {data.get('error', 'Unknown error')}")
+            _ticker_backoff.failure()
             return 0
     except Exception as e:
         logger.error(f"Exception in fetch_tradeogre_ticker: {str(e)}")
+        _ticker_backoff.failure()
         return 0
 
+@ttl_cache(ORDERBOOK_TTL)
 def fetch_tradeogre_orderbook(market_pair):
     """
     Fetch the current orderbook for a given market pair
@@ -52,8 +124,8 @@ def fetch_tradeogre_orderbook(market_pair):
     """
     try:
         url = f"{BASE_URL}/orders/{market_pair}"
-        response = requests.get(url)
-        data = response.json()
+        response = _SESSION.get(url, timeout=REQUEST_TIMEOUT)
+        data = orjson.loads(response.content)
         
         if response.status_code == 200:
             return {
@@ -67,6 +139,7 @@ def fetch_tradeogre_orderbook(market_pair):
         logger.error(f"Exception in fetch_tradeogre_orderbook: {str(e)}")
         return {"buy": {}, "sell": {}}
 
+@swr_cache(ACCOUNT_TTL, ACCOUNT_SWR)
 def fetch_tradeogre_account():
     """
     Fetch account balances from TradeOgre
@@ -76,11 +149,12 @@ def fetch_tradeogre_account():
     """
     try:
         url = f"{BASE_URL}/account/balances"
-        response = requests.get(
+        response = _SESSION.get(
             url, 
-            auth=(TRADEOGRE_KEY, TRADEOGRE_SECRET)
+            auth=(TRADEOGRE_KEY, TRADEOGRE_SECRET),
+            timeout=REQUEST_TIMEOUT
         )
-        data = response.json()
+        data = orjson.loads(response.content)
         
         if data.get("success", False):
             # Return actual balances
@@ -136,17 +210,22 @@ def execute_live_trade(action, amount, price=None, market_pair="BTC-USDT"):
         url = f"{BASE_URL}/order/{endpoint}"
         
         # Make the request to the API
-        response = requests.post(
+        response = _SESSION.post(
             url,
             data=data,
-            auth=(TRADEOGRE_KEY, TRADEOGRE_SECRET)
+            auth=(TRADEOGRE_KEY, TRADEOGRE_SECRET),
+            timeout=REQUEST_TIMEOUT
         )
         
         # Parse response
-        result = response.json()
+        result = orjson.loads(response.content)
         
         if result.get("success", False):
             logger.info(f"Successfully executed {action} order: {amount} @ {price or 'market'}")
+            # Balances and the book just changed; don't serve pre-trade snapshots
+            fetch_tradeogre_account.cache_clear()
+            fetch_tradeogre_orderbook.cache_clear()
+            fetch_tradeogre_ticker.cache_clear()
             return {
                 "success": True,
                 "action": action,
@@ -166,17 +245,29 @@ def execute_live_trade(action, amount, price=None, market_pair="BTC-USDT"):
         logger.error(f"Exception in execute_live_trade: {str(e)}")
         return {"success": False, "error": str(e), "action": action}
 
+# Last parsed Fear & Greed value per file, keyed on its mtime
+_fear_greed_cache = {}
+
 def fetch_fear_and_greed(json_path="data/fear_greed.json"):
     """
     Fetch the latest Fear & Greed index value from a local JSON file.
     Returns an integer 0–100, or None on error.
+
+    The file is only re-parsed when its mtime changes, so repeat calls
+    cost one stat and a rewritten file is picked up immediately.
     """
     try:
-        with open(json_path, "r") as f:
-            data = json.load(f)
+        mtime = os.stat(json_path).st_mtime_ns
+        cached = _fear_greed_cache.get(json_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(json_path, "rb") as f:
+            data = orjson.loads(f.read())
         # The first element is the most recent
         latest = data.get("data", [])[0]
-        return int(latest.get("value", 0))
+        value = int(latest.get("value", 0))
+        _fear_greed_cache[json_path] = (mtime, value)
+        return value
     except Exception as e:
         logger.error(f"Error fetching Fear & Greed index: {e}")
         return None
\ No newline at end of file
@@ -0,0 +1,99 @@
+# strategies/_vault_kernels.py
+"""
+Numba kernels behind VirtualVault, and the trade action codes
+
+The codes are defined here once and imported by the strategies, the
+backtest and the vault, so every kernel and every decoded action column
+agrees on them.
+"""
+import numpy as np
+
+from scripts.jit import njit
+
+# Action codes used by every kernel, decoded to labels via ACTION_LABELS
+HOLD, BUY, SELL, RESET = 0, 1, 2, 3
+ACTION_LABELS = np.array(["HOLD", "BUY", "SELL", "RESET"], dtype=object)
+
+@njit(cache=True)
+def _replay(actions, amounts, prices, btc_balance, usdt_balance, initial_value, last_value):
+    """
+    Apply a run of trades the way execute_trade + update_market_price do
+
+    BUY spends ``amount`` USDT, SELL sells ``amount`` BTC, RESET restores the
+    0.0032 BTC / 150 USDT baseline and HOLD only records the price. A trade
+    larger than the balance is rejected and leaves no rows, as in
+    execute_trade.
+
+    Args:
+        actions (np.ndarray): int8 action codes
+        amounts, prices (np.ndarray): Trade amount and price per step
+        btc_balance, usdt_balance (float): Balances before the first step
+        initial_value (float): Baseline for total return (NaN: first value)
+        last_value (float): Latest recorded portfolio value (NaN: none)
+
+    Returns:
+        tuple: (recorded, traded, usdt_amount, btc_amount, btc_after,
+            usdt_after, portfolio_value, total_return, daily_return,
+            btc_percentage, initial_value) - per-step arrays plus the
+            total-return baseline
+    """
+    n = actions.shape[0]
+    recorded = np.zeros(n, dtype=np.bool_)
+    traded = np.zeros(n, dtype=np.bool_)
+    usdt_amount = np.zeros(n)
+    btc_amount = np.zeros(n)
+    btc_after = np.empty(n)
+    usdt_after = np.empty(n)
+    portfolio_value = np.empty(n)
+    total_return = np.zeros(n)
+    daily_return = np.zeros(n)
+    btc_percentage = np.zeros(n)
+    inv_initial_x100 = 100.0 / initial_value if initial_value > 0 else 0.0
+
+    for i in range(n):
+        code = actions[i]
+        amount = amounts[i]
+        price = prices[i]
+
+        if code == BUY:
+            if amount > usdt_balance:
+                continue
+            usdt_balance -= amount
+            btc_balance += amount / price
+            usdt_amount[i] = amount
+            btc_amount[i] = amount / price
+            traded[i] = True
+        elif code == SELL:
+            if amount > btc_balance:
+                continue
+            btc_balance -= amount
+            usdt_balance += amount * price
+            usdt_amount[i] = amount * price
+            btc_amount[i] = amount
+            traded[i] = True
+        elif code == RESET:
+            usdt_amount[i] = abs(150.0 - usdt_balance)
+            btc_amount[i] = abs(0.0032 - btc_balance)
+            btc_balance = 0.0032
+            usdt_balance = 150.0
+            traded[i] = True
+
+        value = usdt_balance + btc_balance * price
+        if np.isnan(initial_value):
+            initial_value = value
+            inv_initial_x100 = 100.0 / value if value > 0 else 0.0
+        if initial_value > 0:
+            total_return[i] = value * inv_initial_x100 - 100.0
+        if not np.isnan(last_value) and last_value > 0:
+            daily_return[i] = ((value / last_value) - 1) * 100
+        if value != 0:
+            btc_percentage[i] = btc_balance * price / value * 100
+        last_value = value
+
+        recorded[i] = True
+        btc_after[i] = btc_balance
+        usdt_after[i] = usdt_balance
+        portfolio_value[i] = value
+
+    return (recorded, traded, usdt_amount, btc_amount, btc_after, usdt_after,
+            portfolio_value, total_return, daily_return, btc_percentage, initial_value)
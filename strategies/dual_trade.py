@@ -4,8 +4,75 @@ import numpy as np
 from datetime import datetime, timedelta
 import logging
 
+from scripts.jit import njit
+from strategies._vault_kernels import HOLD, BUY, SELL, ACTION_LABELS
+
 logger = logging.getLogger(__name__)
 
+# Order sizing: buys spend 70% of the USDT reserve (increased from 50%),
+# sells offer 30% of the base BTC (decreased from 50%)
+BUY_ALLOCATION = 0.7
+SELL_ALLOCATION = 0.3
+
+@njit(cache=True)
+def _dual_trade_kernel(price, buy_at, day_low, sell_at, day_high,
+                       base_btc, usdt_reserve, buy_usdt_amount, sell_btc_amount,
+                       reinvest_rate):
+    """
+    Day-by-day dual-trade fills over a precomputed price path
+
+    Mirrors DualTradeStrategy.generate_orders and the fill rules of
+    run_backtest. The prices and order levels are drawn up front; only the
+    path-dependent balance updates are left in the loop.
+
+    Args:
+        price (np.ndarray): Daily BTC price
+        buy_at, day_low (np.ndarray): Buy limit and intraday low per day
+        sell_at, day_high (np.ndarray): Sell limit and intraday high per day
+        base_btc, usdt_reserve (float): Starting balances
+        buy_usdt_amount, sell_btc_amount (float): Fixed order sizes, as
+            hoisted by DualTradeStrategy.__init__
+        reinvest_rate (float): As a decimal
+
+    Returns:
+        tuple: (action, btc_balance, usdt_balance, both_filled_days)
+    """
+    n = price.shape[0]
+    action = np.empty(n, dtype=np.int8)
+    btc_after = np.empty(n)
+    usdt_after = np.empty(n)
+    both_filled = 0
+
+    btc_balance = base_btc
+    usdt_balance = usdt_reserve
+
+    for i in range(n):
+        buy_filled = day_low[i] <= buy_at[i]
+        sell_filled = day_high[i] >= sell_at[i]
+        # BTC accumulation: a buy wins when both would fill
+        if buy_filled and sell_filled:
+            both_filled += 1
+            sell_filled = False
+
+        code = HOLD
+        if buy_filled:
+            btc_balance += buy_usdt_amount / buy_at[i]
+            usdt_balance -= buy_usdt_amount
+            code = BUY
+        elif sell_filled:
+            usdt_gained = sell_btc_amount * sell_at[i]
+            btc_balance -= sell_btc_amount
+            usdt_balance += usdt_gained
+            profit = usdt_gained - (sell_btc_amount * price[i])
+            usdt_balance += profit * reinvest_rate
+            code = SELL
+
+        action[i] = code
+        btc_after[i] = btc_balance
+        usdt_after[i] = usdt_balance
+
+    return action, btc_after, usdt_after, both_filled
+
 class DualTradeStrategy:
     """
     Dual-Trade strategy - places both buy and sell orders simultaneously
@@ -29,6 +96,13 @@ class DualTradeStrategy:
         self.sell_premium = sell_premium / 100.0  # Convert to decimal
         self.reinvest_rate = reinvest_rate / 100.0  # Convert to decimal
         
+        # Price multipliers and order sizes are fixed per strategy; hoisted
+        # here so generate_orders and the backtest just multiply
+        self._buy_mul = 1.0 - self.buy_discount
+        self._sell_mul = 1.0 + self.sell_premium
+        self._buy_usdt_amount = self.usdt_reserve * BUY_ALLOCATION
+        self._sell_btc_amount = self.base_btc * SELL_ALLOCATION
+        
     def generate_orders(self, current_price):
         """
         Generate buy and sell orders based on strategy parameters
@@ -41,16 +115,13 @@ class DualTradeStrategy:
             tuple: (buy_order, sell_order) dictionaries
         """
         # Calculate buy and sell prices
-        buy_price = current_price * (1 - self.buy_discount)
-        sell_price = current_price * (1 + self.sell_premium)
+        buy_price = current_price * self._buy_mul
+        sell_price = current_price * self._sell_mul
         
         # Calculate order sizes (in BTC)
-        # Buy order: We use 70% of USDT reserve (increased from 50%)
-        buy_usdt_amount = self.usdt_reserve * 0.7
+        buy_usdt_amount = self._buy_usdt_amount
         buy_btc_amount = buy_usdt_amount / buy_price
-        
-        # Sell order: We use 30% of base BTC (decreased from 50%)
-        sell_btc_amount = self.base_btc * 0.3
+        sell_btc_amount = self._sell_btc_amount
         
         # Create order dictionaries
         buy_order = {
@@ -69,114 +140,53 @@ class DualTradeStrategy:
         
         return buy_order, sell_order
     
-    def run_backtest(self, days=30, initial_price=90000):
+    def run_backtest(self, days=30, initial_price=90000, return_df=True, end_date=None):
         """
         Run a backtest of the Dual-Trade strategy with Bitcoin accumulation focus
         
         Args:
             days (int): Number of days to backtest
             initial_price (float): Initial BTC price (updated to 90000)
+            return_df (bool): Wrap the results in a DataFrame; when False
+                results is a dict of the column arrays instead
+            end_date (datetime): Last backtest day; defaults to now. Pass
+                one anchor to make a batch of runs share identical dates
             
         Returns:
             tuple: (results_df, final_btc, final_usdt) 
         """
         # Create date range for backtest
-        end_date = datetime.now()
+        end_date = end_date or datetime.now()
         start_date = end_date - timedelta(days=days)
         date_range = pd.date_range(start=start_date, end=end_date, freq='D')
         
-        # Initialize lists for results
-        results = []
-        
-        # Initialize balances
-        btc_balance = self.base_btc
-        usdt_balance = self.usdt_reserve
-        
-        # Set initial price
-        btc_price = initial_price
-        
-        # Set a random seed for reproducible results
-        np.random.seed(42)
-        
-        for date in date_range:
-            # Simulate daily price movement with more positive drift
-            daily_change = np.random.normal(0.002, 0.023)  # Increased mean drift
-            btc_price *= (1 + daily_change)
-            
-            # Calculate portfolio value
-            portfolio_value = usdt_balance + (btc_balance * btc_price)
-            
-            # Generate orders for this day
-            buy_order, sell_order = self.generate_orders(btc_price)
-            
-            # Determine if orders would be filled based on price movement
-            # Assuming a price range during the day
-            day_low = btc_price * (1 - abs(np.random.normal(0, 0.017)))  # Daily low
-            day_high = btc_price * (1 + abs(np.random.normal(0, 0.017)))  # Daily high
-            
-            # Check if buy order would be filled (price dipped below buy price)
-            buy_filled = day_low <= buy_order['price']
-            
-            # Check if sell order would be filled (price spiked above sell price)
-            sell_filled = day_high >= sell_order['price']
-            
-            # Initialize action for this day
-            action = "HOLD"
-            trade_price = btc_price  # Default to current price
-            
-            # Process orders if filled - BTC accumulation strategy prioritizes buys
-            # If both would fill, prioritize buys (changed from previous version)
-            if buy_filled and sell_filled:
-                # Prioritize buy over sell for BTC accumulation
-                buy_filled = True
-                sell_filled = False
-                logger.info(f"Both orders would fill - prioritizing BUY for BTC accumulation")
-                
-            if buy_filled:
-                # Buy order filled
-                btc_gained = buy_order['btc_amount']
-                usdt_spent = buy_order['usdt_amount']
-                
-                # Update balances
-                btc_balance += btc_gained
-                usdt_balance -= usdt_spent
-                
-                action = "BUY"
-                trade_price = buy_order['price']
-                
-            elif sell_filled:
-                # Sell order filled
-                btc_sold = sell_order['btc_amount']
-                usdt_gained = sell_order['usdt_amount']
-                
-                # Update balances
-                btc_balance -= btc_sold
-                usdt_balance += usdt_gained
-                
-                # Higher reinvestment rate - more goes into new buys
-                profit = usdt_gained - (btc_sold * btc_price)
-                reinvest_amount = profit * self.reinvest_rate
-                
-                # Add reinvestment to USDT balance (rest is profit taken)
-                usdt_balance += reinvest_amount
-                
-                action = "SELL"
-                trade_price = sell_order['price']
-                
-            # Record results
-            results.append({
-                'date': date,
-                'price': btc_price,
-                'action': action,
-                'buy_price': buy_order['price'],
-                'sell_price': sell_order['price'],
-                'btc_balance': btc_balance,
-                'usdt_balance': usdt_balance,
-                'portfolio_value': portfolio_value
-            })
-        
-        # Convert results to DataFrame
-        df = pd.DataFrame(results)
+        # Fixed-seed PCG64 stream for reproducible results: each day's price
+        # move and intraday low/high, drawn in one call
+        rng = np.random.default_rng(42)
+        shocks = rng.standard_normal((len(date_range), 3))
+
+        # Whole price path and order levels in one pass
+        price = initial_price * np.cumprod(1 + (0.002 + 0.023 * shocks[:, 0]))
+        buy_price = price * self._buy_mul
+        sell_price = price * self._sell_mul
+        day_low = price * (1 - np.abs(0.017 * shocks[:, 1]))
+        day_high = price * (1 + np.abs(0.017 * shocks[:, 2]))
+
+        action, btc_after, usdt_after, both_filled = _dual_trade_kernel(
+            price, buy_price, day_low, sell_price, day_high,
+            float(self.base_btc), float(self.usdt_reserve),
+            float(self._buy_usdt_amount), float(self._sell_btc_amount), self.reinvest_rate
+        )
+        if both_filled:
+            logger.info(f"Both orders would fill on {both_filled} days - prioritized BUY for BTC accumulation")
+
+        # Value at each day's price, before that day's fills
+        btc_before = np.concatenate(([self.base_btc], btc_after[:-1]))
+        usdt_before = np.concatenate(([self.usdt_reserve], usdt_after[:-1]))
+        portfolio_value = usdt_before + btc_before * price
+
+        btc_balance = float(btc_after[-1]) if len(price) else self.base_btc
+        usdt_balance = float(usdt_after[-1]) if len(price) else self.usdt_reserve
         
         # Log BTC accumulation metrics
         initial_btc = self.base_btc
@@ -187,4 +197,27 @@ class DualTradeStrategy:
         logger.info(f"Final BTC: {final_btc:.8f}")
         logger.info(f"BTC Accumulated: {btc_accumulated:.8f} ({(btc_accumulated/initial_btc)*100:.2f}%)")
         
+        if not return_df:
+            results = {
+                'date': date_range.to_numpy(),
+                'price': price,
+                'action': ACTION_LABELS[action],
+                'buy_price': buy_price,
+                'sell_price': sell_price,
+                'btc_balance': btc_after,
+                'usdt_balance': usdt_after,
+                'portfolio_value': portfolio_value
+            }
+            return results, btc_balance, usdt_balance
+
+        df = pd.DataFrame({
+            'date': date_range,
+            'price': price,
+            'action': pd.Categorical.from_codes(action, categories=ACTION_LABELS),
+            'buy_price': buy_price,
+            'sell_price': sell_price,
+            'btc_balance': btc_after,
+            'usdt_balance': usdt_after,
+            'portfolio_value': portfolio_value
+        })
         return df, btc_balance, usdt_balance
\ No newline at end of file
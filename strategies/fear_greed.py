@@ -3,9 +3,80 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
+import os
+
+from scripts.jit import njit
+from strategies._vault_kernels import HOLD, BUY, SELL, RESET, ACTION_LABELS
 
 logger = logging.getLogger(__name__)
 
+# Generator for the simulated live index
+_RNG = np.random.default_rng()
+
+def _reset_rng():
+    # Forked background workers would otherwise replay the parent's draws
+    global _RNG
+    _RNG = np.random.default_rng()
+
+os.register_at_fork(after_in_child=_reset_rng)
+
+@njit(cache=True)
+def _signal(fg_index, usdt_balance, btc_balance, fg_fear, fg_greed):
+    """
+    Bitcoin-accumulation signal as (action code, amount)
+
+    Reset once BTC reaches 0.015, buy with 75% of USDT on fear, sell 25%
+    of BTC on greed, otherwise hold.
+    """
+    if btc_balance >= 0.015:
+        return RESET, btc_balance
+    if fg_index < fg_fear and usdt_balance > 0:
+        return BUY, usdt_balance * 0.75
+    if fg_index > fg_greed and btc_balance > 0:
+        return SELL, btc_balance * 0.25
+    return HOLD, 0.0
+
+@njit(cache=True)
+def _simulate(prices, fg_indexes, start_usdc, start_btc, fg_fear, fg_greed):
+    """
+    Day-by-day balances for the Fear & Greed accumulation strategy
+
+    Returns:
+        tuple: (action, usdc_before, btc_before, usdc_after, btc_after) arrays
+    """
+    n = prices.shape[0]
+    action = np.empty(n, dtype=np.int8)
+    usdc_before = np.empty(n)
+    btc_before = np.empty(n)
+    usdc_after = np.empty(n)
+    btc_after = np.empty(n)
+
+    usdc_balance = start_usdc
+    btc_balance = start_btc
+
+    for i in range(n):
+        # Balances carried in from the previous day
+        usdc_before[i] = usdc_balance
+        btc_before[i] = btc_balance
+
+        code, amount = _signal(fg_indexes[i], usdc_balance, btc_balance, fg_fear, fg_greed)
+        if code == BUY:
+            usdc_balance -= amount
+            btc_balance += amount / prices[i]
+        elif code == SELL:
+            btc_balance -= amount
+            usdc_balance += amount * prices[i]
+        elif code == RESET:
+            # Modified reset to keep more BTC: less USDT, more BTC
+            usdc_balance = 150.0
+            btc_balance = 0.0032
+
+        action[i] = code
+        usdc_after[i] = usdc_balance
+        btc_after[i] = btc_balance
+
+    return action, usdc_before, btc_before, usdc_after, btc_after
+
 def get_live_trade_signal(fg_index, usdt_balance, btc_balance, fg_fear=35, fg_greed=65):
     """
     Generate a trade signal based on Fear & Greed index
@@ -24,33 +95,44 @@ def get_live_trade_signal(fg_index, usdt_balance, btc_balance, fg_fear=35, fg_gr
     # If we don't have a real fg_index, we'll simulate one for demo
     if fg_index is None:
         # Simulate an index between 0-100
-        fg_index = np.random.randint(0, 100)
+        fg_index = int(_RNG.integers(0, 100))
         logger.info(f"Using simulated Fear & Greed index: {fg_index}")
     
-    # Reset condition: If BTC balance is above threshold
-    # Increased threshold to accumulate more BTC before reset
-    if btc_balance >= 0.015:
-        # Modified reset to keep more BTC after reset
-        return "RESET", btc_balance
-        
-    # Buy signal: Index below fear threshold and we have USDT
-    # More aggressive buying (75% instead of 50%)
-    if fg_index < fg_fear and usdt_balance > 0:
-        # Use 75% of available USDT to buy more BTC
-        amount = usdt_balance * 0.75
-        return "BUY", amount
-        
-    # Sell signal: Index above greed threshold and we have BTC
-    # More conservative selling (25% instead of 50%)
-    if fg_index > fg_greed and btc_balance > 0:
-        # Sell only 25% of available BTC
-        amount = btc_balance * 0.25
-        return "SELL", amount
-    
-    # Default is to hold
-    return "HOLD", 0
+    code, amount = _signal(
+        float(fg_index), float(usdt_balance), float(btc_balance), float(fg_fear), float(fg_greed)
+    )
+    return ACTION_LABELS[code], amount
+
+def get_live_trade_signals(fg_indexes, usdt_balances, btc_balances, fg_fear=35, fg_greed=65):
+    """
+    Vectorized get_live_trade_signal over whole series
+
+    Evaluates the same reset/buy/sell/hold rules element-wise, e.g. to ask
+    what the signal would have been on every day of a history.
+
+    Args:
+        fg_indexes (array-like): Fear & Greed index values
+        usdt_balances (array-like): USDT balance per row
+        btc_balances (array-like): BTC balance per row
+        fg_fear (int): Fear threshold - buy signal
+        fg_greed (int): Greed threshold - sell signal
+
+    Returns:
+        tuple: (actions, amounts) arrays of labels and trade amounts
+    """
+    fg = np.asarray(fg_indexes, dtype=np.float64)
+    usdt = np.asarray(usdt_balances, dtype=np.float64)
+    btc = np.asarray(btc_balances, dtype=np.float64)
 
-def run_backtest(start_usdc=100, start_btc=0.001, fg_fear=35, fg_greed=65, days=60):
+    reset = btc >= 0.015
+    buy = ~reset & (fg < fg_fear) & (usdt > 0)
+    sell = ~reset & ~buy & (fg > fg_greed) & (btc > 0)
+
+    codes = np.select([reset, buy, sell], [RESET, BUY, SELL], default=HOLD)
+    amounts = np.select([reset, buy, sell], [btc, usdt * 0.75, btc * 0.25], default=0.0)
+    return ACTION_LABELS[codes], amounts
+
+def run_backtest(start_usdc=100, start_btc=0.001, fg_fear=35, fg_greed=65, days=60, return_df=True, end_date=None):
     """
     Run a backtest of the Bitcoin Accumulation Fear & Greed strategy
     
@@ -60,88 +142,68 @@ def run_backtest(start_usdc=100, start_btc=0.001, fg_fear=35, fg_greed=65, days=
         fg_fear (int): Fear threshold (default 35 instead of 40)
         fg_greed (int): Greed threshold (default 65 instead of 60)
         days (int): Number of days to backtest
+        return_df (bool): Wrap the results in a DataFrame; when False the
+            column arrays are returned as a dict instead
+        end_date (datetime): Last backtest day; defaults to now. Pass one
+            anchor to make a batch of runs share identical dates
         
     Returns:
-        pd.DataFrame: Backtest results
+        pd.DataFrame: Backtest results (dict of NumPy arrays if not return_df)
     """
     # Create date range for backtest
-    end_date = datetime.now()
+    end_date = end_date or datetime.now()
     start_date = end_date - timedelta(days=days)
     date_range = pd.date_range(start=start_date, end=end_date, freq='D')
     
-    # Initialize DataFrame for results
-    results = []
+    n = len(date_range)
     
-    # Initial values
-    usdc_balance = start_usdc
-    btc_balance = start_btc
+    # Fixed-seed stream for reproducible results, kept off numpy's global state
+    rng = np.random.default_rng(42)
     
-    # Set a random seed for reproducible results
-    np.random.seed(42)
+    # Initial price around current market price with some variation, then a
+    # random walk with a slightly positive drift for long-term appreciation
+    initial_price = 90000 + rng.normal(0, 2000)
+    price_changes = rng.normal(0.002, 0.022, n)
+    prices = initial_price * np.cumprod(1 + price_changes)
     
-    # Initial price around current market price with some variation
-    btc_price = 90000 + np.random.normal(0, 2000)
+    # Simulated Fear & Greed index
+    fg_indexes = rng.integers(0, 100, n)
     
-    for date in date_range:
-        # Simulate price movement (random walk with drift)
-        # Slightly more positive drift to reflect long-term BTC appreciation
-        price_change = np.random.normal(0.002, 0.022)  # Positive mean drift
-        btc_price *= (1 + price_change)
-        
-        # Simulate Fear & Greed index
-        fg_index = np.random.randint(0, 100)
-        
-        # Calculate portfolio value
-        portfolio_value = usdc_balance + (btc_balance * btc_price)
-        
-        # Get trade signal based on Bitcoin accumulation strategy
-        action, amount = get_live_trade_signal(fg_index, usdc_balance, btc_balance, fg_fear, fg_greed)
-        
-        # Execute trade in simulation
-        if action == "BUY":
-            # Calculate how much BTC we can buy with the USDT amount
-            btc_amount = amount / btc_price
-            
-            # Update balances
-            usdc_balance -= amount
-            btc_balance += btc_amount
-            
-        elif action == "SELL":
-            # Calculate USDT we'll receive
-            usdt_amount = amount * btc_price
-            
-            # Update balances
-            btc_balance -= amount
-            usdc_balance += usdt_amount
-            
-        elif action == "RESET":
-            # Modified reset to keep more BTC
-            usdc_balance = 150  # Less USDT
-            btc_balance = 0.0032  # More BTC
-        
-        # Record results
-        results.append({
-            'date': date,
-            'price': btc_price,
-            'fg_index': fg_index,
-            'action': action,
-            'usdc_before': start_usdc if date == date_range[0] else results[-1]['usdc_after'],
-            'btc_before': start_btc if date == date_range[0] else results[-1]['btc_after'],
-            'usdc_after': usdc_balance,
-            'btc_after': btc_balance,
-            'portfolio_value': portfolio_value
-        })
-    
-    # Convert results to DataFrame
-    df = pd.DataFrame(results)
+    action, usdc_before, btc_before, usdc_after, btc_after = _simulate(
+        prices, fg_indexes.astype(np.float64),
+        float(start_usdc), float(start_btc), float(fg_fear), float(fg_greed)
+    )
     
-    # Calculate BTC and USD holdings over time
-    initial_btc_value = start_btc * df['price'].iloc[0]
-    final_btc_value = df['btc_after'].iloc[-1] * df['price'].iloc[-1]
+    # Portfolio value before each day's trade
+    portfolio_values = usdc_before + btc_before * prices
     
     # Log performance metrics
+    initial_btc_value = start_btc * prices[0]
     logger.info(f"Initial Portfolio: {start_usdc + initial_btc_value:.2f} USD")
-    logger.info(f"Final Portfolio: {df['portfolio_value'].iloc[-1]:.2f} USD")
-    logger.info(f"BTC Accumulated: {df['btc_after'].iloc[-1] - start_btc:.8f} BTC")
+    logger.info(f"Final Portfolio: {portfolio_values[-1]:.2f} USD")
+    logger.info(f"BTC Accumulated: {btc_after[-1] - start_btc:.8f} BTC")
+    
+    if not return_df:
+        return {
+            'date': date_range.to_numpy(),
+            'price': prices,
+            'fg_index': fg_indexes,
+            'action': ACTION_LABELS[action],
+            'usdc_before': usdc_before,
+            'btc_before': btc_before,
+            'usdc_after': usdc_after,
+            'btc_after': btc_after,
+            'portfolio_value': portfolio_values
+        }
     
-    return df
\ No newline at end of file
+    return pd.DataFrame({
+        'date': date_range,
+        'price': prices,
+        'fg_index': fg_indexes,
+        'action': pd.Categorical.from_codes(action, categories=ACTION_LABELS),
+        'usdc_before': usdc_before,
+        'btc_before': btc_before,
+        'usdc_after': usdc_after,
+        'btc_after': btc_after,
+        'portfolio_value': portfolio_values
+    })
\ No newline at end of file
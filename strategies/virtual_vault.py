@@ -1,12 +1,128 @@
 # strategies/virtual_vault.py
-import pandas as pd
 import numpy as np
 from datetime import datetime
-import json
 import logging
 
+from strategies._vault_kernels import BUY, SELL, RESET, ACTION_LABELS, _replay
+
+# pandas is only imported by the DataFrame accessors, so code that just
+# trades and replays (e.g. backtest workers) never pays for loading it
+
 logger = logging.getLogger(__name__)
 
+# Label -> code for stores and callers that pass action names
+_ACTION_CODES = {label: code for code, label in enumerate(ACTION_LABELS)}
+
+# Column dtypes of the two histories, in export order. Recorded figures are
+# float32 (ample for display and analytics, half the memory); the live
+# balances on the vault stay float64 so rounding never accumulates.
+TRADE_DTYPES = {
+    "timestamp": "datetime64[ns]",
+    "action": np.int8,
+    "price": np.float32,
+    "usdt_amount": np.float32,
+    "btc_amount": np.float32,
+    "usdt_balance": np.float32,
+    "btc_balance": np.float32
+}
+PORTFOLIO_DTYPES = {
+    "timestamp": "datetime64[ns]",
+    "btc_price": np.float32,
+    "btc_balance": np.float32,
+    "usdt_balance": np.float32,
+    "portfolio_value": np.float32,
+    "total_return": np.float32,
+    "daily_return": np.float32,
+    "btc_percentage": np.float32
+}
+
+def _batch_timestamps(timestamps, n):
+    """Stamps for a batch of n rows: as given, or now, one microsecond apart"""
+    if timestamps is None:
+        return np.datetime64(datetime.now(), "ns") + np.arange(n) * np.timedelta64(1, "us")
+    return np.asarray(timestamps, dtype="datetime64[ns]")
+
+def _to_columns(records):
+    """Turn a list of row dicts into a dict of column lists"""
+    if not records:
+        return {}
+    return {key: [row[key] for row in records] for key in records[0]}
+
+class _History:
+    """
+    Append-only table stored as one NumPy array per column
+
+    Rows are written in place at a cursor and the buffers double when
+    full, so appends are amortized O(1) and exporting a column is a slice.
+    """
+
+    def __init__(self, dtypes, capacity=64):
+        self._n = 0
+        self._cols = {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+
+    def __len__(self):
+        return self._n
+
+    def extend(self, **columns):
+        """Write many rows at once; every column must be given, equally long"""
+        count = len(columns["timestamp"])
+        capacity = len(self._cols["timestamp"])
+        if self._n + count > capacity:
+            while capacity < self._n + count:
+                capacity *= 2
+            self._grow(capacity)
+        for name, values in columns.items():
+            self._cols[name][self._n:self._n + count] = values
+        self._n += count
+
+    def append(self, **row):
+        """Write one row; every column must be given"""
+        if self._n == len(self._cols["timestamp"]):
+            self._grow(2 * self._n)
+        for name, value in row.items():
+            self._cols[name][self._n] = value
+        self._n += 1
+
+    def _grow(self, capacity):
+        for name, col in self._cols.items():
+            grown = np.empty(capacity, dtype=col.dtype)
+            grown[:self._n] = col[:self._n]
+            self._cols[name] = grown
+
+    def column(self, name, start=0):
+        """View of the filled rows of one column, from ``start``"""
+        return self._cols[name][start:self._n]
+
+    def columns(self):
+        """Copies of every column, trimmed to the filled rows"""
+        return {name: col[:self._n].copy() for name, col in self._cols.items()}
+
+    @classmethod
+    def from_columns(cls, dtypes, columns):
+        """
+        Rebuild a history from ``columns()`` output
+
+        Also accepts the older stored layouts: column lists with ISO
+        timestamp strings and action labels, or a list of row dicts.
+        """
+        if isinstance(columns, list):
+            columns = _to_columns(columns)
+        n = len(columns["timestamp"]) if columns else 0
+        history = cls(dtypes, capacity=max(n, 64))
+        for name, dtype in dtypes.items():
+            if not n:
+                break
+            if name not in columns:
+                # Column added after this history was stored
+                history._cols[name][:n] = np.nan
+                continue
+            values = columns[name]
+            if name == "action" and not np.issubdtype(np.asarray(values).dtype, np.integer):
+                values = [_ACTION_CODES[label] for label in values]
+            history._cols[name][:n] = np.asarray(values, dtype=dtype)
+        history._n = n
+        return history
+
 class VirtualVault:
     """
     Virtual vault for managing trading assets in test mode
@@ -22,14 +138,72 @@ class VirtualVault:
         """
         self.btc_balance = initial_btc
         self.usdt_balance = initial_usdt
-        self.trade_history = []
-        self.portfolio_history = []
+        # Histories as column arrays (see _History)
+        self._trades = _History(TRADE_DTYPES)
+        self._portfolio = _History(PORTFOLIO_DTYPES)
         self.initial_portfolio_value = None
+        # Latest recorded portfolio value, kept alongside the history
+        self._last_value = None
+        # Stamp of a trade whose portfolio row was left to the next tick
+        self._deferred_ts = None
+        
+        # DataFrame views of the histories, rebuilt only when a trade lands
+        self._trade_df = None
+        self._portfolio_df = None
         
         # Record initial state
         self.update_market_price(90000)  # Updated starting price
         
-    def execute_trade(self, action, amount, price):
+    @property
+    def initial_portfolio_value(self):
+        """Portfolio value that total returns are measured against"""
+        return self._initial_value
+    
+    @initial_portfolio_value.setter
+    def initial_portfolio_value(self, value):
+        self._initial_value = value
+        # Total return is value * (100 / initial) - 100: one multiply per tick
+        self._inv_initial_x100 = 100.0 / value if value is not None and value > 0 else None
+        
+    def _buy(self, amount, price):
+        """Spend ``amount`` USDT on BTC; returns (usdt_amount, btc_amount) or None"""
+        # Check if we have enough USDT
+        if amount > self.usdt_balance:
+            logger.warning(f"Not enough USDT for buy: {amount} > {self.usdt_balance}")
+            return None
+        btc_amount = amount / price
+        self.usdt_balance -= amount
+        self.btc_balance += btc_amount
+        return amount, btc_amount
+        
+    def _sell(self, amount, price):
+        """Sell ``amount`` BTC for USDT; returns (usdt_amount, btc_amount) or None"""
+        # Check if we have enough BTC
+        if amount > self.btc_balance:
+            logger.warning(f"Not enough BTC for sell: {amount} > {self.btc_balance}")
+            return None
+        usdt_amount = amount * price
+        self.btc_balance -= amount
+        self.usdt_balance += usdt_amount
+        return usdt_amount, amount
+        
+    def _reset(self, amount, price):
+        """Reset to Bitcoin-favorable balances; returns the amounts moved"""
+        old_btc = self.btc_balance
+        old_usdt = self.usdt_balance
+        # Modified reset values for BTC accumulation
+        self.btc_balance = 0.0032  # Higher BTC balance
+        self.usdt_balance = 150  # Lower USDT balance
+        return abs(self.usdt_balance - old_usdt), abs(self.btc_balance - old_btc)
+        
+    # Action label -> (stored code, balance update)
+    _DISPATCH = {
+        "BUY": (BUY, _buy),
+        "SELL": (SELL, _sell),
+        "RESET": (RESET, _reset)
+    }
+        
+    def execute_trade(self, action, amount, price, record_portfolio=True):
         """
         Execute a trade in the virtual vault
         
@@ -37,85 +211,118 @@ class VirtualVault:
             action (str): "BUY", "SELL", or "RESET"
             amount (float): Amount to trade
             price (float): Current price
+            record_portfolio (bool): Also append a portfolio row at ``price``.
+                Callers that tick update_market_price themselves right after
+                can pass False to avoid recording the same bar twice; that
+                tick is then stamped with the trade's time
             
         Returns:
             bool: True if trade was successful
         """
         timestamp = datetime.now()
         
-        if action == "BUY":
-            # Calculate how much BTC we can buy
-            btc_amount = amount / price
-            
-            # Check if we have enough USDT
-            if amount > self.usdt_balance:
-                logger.warning(f"Not enough USDT for buy: {amount} > {self.usdt_balance}")
+        entry = self._DISPATCH.get(action)
+        if entry is not None:
+            code, handler = entry
+            amounts = handler(self, amount, price)
+            if amounts is None:
                 return False
-            
-            # Execute buy
-            self.usdt_balance -= amount
-            self.btc_balance += btc_amount
-            
-            # Record trade
-            self.trade_history.append({
-                "timestamp": timestamp.isoformat(),
-                "action": "BUY",
-                "price": price,
-                "usdt_amount": amount,
-                "btc_amount": btc_amount,
-                "usdt_balance": self.usdt_balance,
-                "btc_balance": self.btc_balance
-            })
-            
-        elif action == "SELL":
-            # Calculate USDT we'll receive
-            usdt_amount = amount * price
-            
-            # Check if we have enough BTC
-            if amount > self.btc_balance:
-                logger.warning(f"Not enough BTC for sell: {amount} > {self.btc_balance}")
-                return False
-            
-            # Execute sell
-            self.btc_balance -= amount
-            self.usdt_balance += usdt_amount
-            
-            # Record trade
-            self.trade_history.append({
-                "timestamp": timestamp.isoformat(),
-                "action": "SELL",
-                "price": price,
-                "usdt_amount": usdt_amount,
-                "btc_amount": amount,
-                "usdt_balance": self.usdt_balance,
-                "btc_balance": self.btc_balance
-            })
-            
-        elif action == "RESET":
-            # Reset to Bitcoin-favorable values
-            old_btc = self.btc_balance
-            old_usdt = self.usdt_balance
-            
-            # Modified reset values for BTC accumulation
-            self.btc_balance = 0.0032  # Higher BTC balance
-            self.usdt_balance = 150  # Lower USDT balance
-            
-            # Record reset
-            self.trade_history.append({
-                "timestamp": timestamp.isoformat(),
-                "action": "RESET",
-                "price": price,
-                "usdt_amount": abs(self.usdt_balance - old_usdt),
-                "btc_amount": abs(self.btc_balance - old_btc),
-                "usdt_balance": self.usdt_balance,
-                "btc_balance": self.btc_balance
-            })
+            self._trades.append(
+                timestamp=timestamp,
+                action=code,
+                price=price,
+                usdt_amount=amounts[0],
+                btc_amount=amounts[1],
+                usdt_balance=self.usdt_balance,
+                btc_balance=self.btc_balance
+            )
+        
+        # A new trade can change the action of any history row
+        self._trade_df = None
+        self._portfolio_df = None
         
-        # Update portfolio history
-        self.update_market_price(price)
+        # Update portfolio history, stamped with the trade's own time so the
+        # row is tagged with this action
+        if record_portfolio:
+            self.update_market_price(price, timestamp)
+        else:
+            self._deferred_ts = timestamp
         
         return True
         
+    def replay_batch(self, actions, amounts, prices, timestamps=None):
+        """
+        Apply a sequence of trades in one compiled pass
+        
+        Equivalent to calling execute_trade (or update_market_price for
+        HOLD) once per step, but the arithmetic runs in a numba kernel and
+        the history rows are written as whole columns.
+        
+        Args:
+            actions (array-like): "BUY", "SELL", "RESET" or "HOLD" per step
+            amounts (array-like): USDT to spend (BUY) or BTC to sell (SELL)
+            prices (array-like): Price per step
+            timestamps (array-like, optional): Time of each step; defaults to
+                now, one microsecond apart so every row keeps its own action
+            
+        Returns:
+            np.ndarray: Per-step flags, False where a trade was rejected
+        """
+        actions = np.asarray(actions)
+        if not np.issubdtype(actions.dtype, np.integer):
+            actions = np.array([_ACTION_CODES[a] for a in actions], dtype=np.int8)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if not len(prices):
+            return np.zeros(0, dtype=bool)
+        timestamps = _batch_timestamps(timestamps, len(prices))
+        
+        initial = self.initial_portfolio_value
+        last = self.get_last_portfolio_value()
+        (recorded, traded, usdt_amount, btc_amount, btc_after, usdt_after,
+         portfolio_value, total_return, daily_return, btc_percentage, initial) = _replay(
+            actions.astype(np.int8), amounts, prices,
+            float(self.btc_balance), float(self.usdt_balance),
+            np.nan if initial is None else float(initial),
+            np.nan if last is None else last
+        )
+        
+        if traded.any():
+            self._trades.extend(
+                timestamp=timestamps[traded],
+                action=actions[traded],
+                price=prices[traded],
+                usdt_amount=usdt_amount[traded],
+                btc_amount=btc_amount[traded],
+                usdt_balance=usdt_after[traded],
+                btc_balance=btc_after[traded]
+            )
+            self._trade_df = None
+            self._portfolio_df = None
+        if recorded.any():
+            self._portfolio.extend(
+                timestamp=timestamps[recorded],
+                btc_price=prices[recorded],
+                btc_balance=btc_after[recorded],
+                usdt_balance=usdt_after[recorded],
+                portfolio_value=portfolio_value[recorded],
+                total_return=total_return[recorded],
+                daily_return=daily_return[recorded],
+                btc_percentage=btc_percentage[recorded]
+            )
+            last_row = np.flatnonzero(recorded)[-1]
+            self.btc_balance = float(btc_after[last_row])
+            self.usdt_balance = float(usdt_after[last_row])
+            self._last_value = float(portfolio_value[last_row])
+        # The kernel marks "no baseline yet" with NaN; keep None for that
+        self.initial_portfolio_value = None if np.isnan(initial) else float(initial)
+        
+        rejected = len(recorded) - int(recorded.sum())
+        if rejected:
+            logger.warning(f"Skipped {rejected} trades exceeding the available balance")
+        
+        return recorded
+        
     def reset(self, btc_balance, usdt_balance):
         """
         Reset vault to specific values
@@ -127,42 +334,122 @@ class VirtualVault:
         self.btc_balance = btc_balance
         self.usdt_balance = usdt_balance
         
-    def update_market_price(self, price):
+    def update_market_price(self, price, timestamp=None):
         """
         Update portfolio history with current market price
         
         Args:
             price (float): Current market price
+            timestamp (datetime, optional): Time of the update; defaults to the
+                time of a trade recorded without its row, else now
         """
-        timestamp = datetime.now()
-        portfolio_value = self.get_total_value_usd(price)
+        if timestamp is None:
+            timestamp = self._deferred_ts or datetime.now()
+        self._deferred_ts = None
         
         # Set initial portfolio value if not set
         if self.initial_portfolio_value is None:
-            self.initial_portfolio_value = portfolio_value
+            self.initial_portfolio_value = self.get_total_value_usd(price)
+        
+        portfolio_value, total_return, daily_return, btc_percentage = self.latest_metrics(price)
+        
+        # Record portfolio state
+        self._portfolio.append(
+            timestamp=timestamp,
+            btc_price=price,
+            btc_balance=self.btc_balance,
+            usdt_balance=self.usdt_balance,
+            portfolio_value=portfolio_value,
+            total_return=total_return,
+            daily_return=daily_return,
+            btc_percentage=btc_percentage
+        )
+        self._last_value = portfolio_value
+    
+    def update_market_price_batch(self, prices, timestamps=None):
+        """
+        Record a run of price ticks at once
+        
+        Same rows as calling update_market_price per price; balances don't
+        move between ticks, so every column is one vectorized expression.
+        
+        Args:
+            prices (array-like): Market price per tick
+            timestamps (array-like, optional): Time of each tick; defaults to
+                now, one microsecond apart
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if not len(prices):
+            return
+        timestamps = _batch_timestamps(timestamps, len(prices))
+        
+        btc_value = self.btc_balance * prices
+        values = self.usdt_balance + btc_value
+        if self.initial_portfolio_value is None:
+            self.initial_portfolio_value = float(values[0])
+        
+        if self._inv_initial_x100 is not None:
+            total_return = values * self._inv_initial_x100 - 100.0
+        else:
+            total_return = np.zeros_like(values)
+        
+        # Each tick is measured against the one before it
+        previous = np.empty_like(values)
+        previous[0] = np.nan if self._last_value is None else self._last_value
+        previous[1:] = values[:-1]
+        valid = previous > 0
+        daily_return = np.zeros_like(values)
+        daily_return[valid] = ((values[valid] / previous[valid]) - 1) * 100
         
-        # Calculate returns
-        total_return = 0
-        daily_return = 0
+        btc_percentage = np.zeros_like(values)
+        np.divide(btc_value * 100, values, out=btc_percentage, where=values != 0)
         
-        if self.initial_portfolio_value > 0:
-            total_return = ((portfolio_value / self.initial_portfolio_value) - 1) * 100
+        self._portfolio.extend(
+            timestamp=timestamps,
+            btc_price=prices,
+            btc_balance=np.full(len(prices), self.btc_balance),
+            usdt_balance=np.full(len(prices), self.usdt_balance),
+            portfolio_value=values,
+            total_return=total_return,
+            daily_return=daily_return,
+            btc_percentage=btc_percentage
+        )
+        self._last_value = float(values[-1])
+        
+    def latest_metrics(self, price):
+        """
+        Current figures at ``price`` as plain floats, without recording a row
+        
+        Args:
+            price (float): Current BTC price
             
-        if len(self.portfolio_history) > 0:
-            last_value = self.portfolio_history[-1]["portfolio_value"]
-            if last_value > 0:
-                daily_return = ((portfolio_value / last_value) - 1) * 100
+        Returns:
+            tuple: (portfolio_value, total_return, daily_return, btc_percentage),
+                returns in percent; the share of value held in BTC is kept so
+                history exports don't recompute it
+        """
+        portfolio_value = self.get_total_value_usd(price)
         
-        # Record portfolio state
-        self.portfolio_history.append({
-            "timestamp": timestamp.isoformat(),
-            "btc_price": price,
-            "btc_balance": self.btc_balance,
-            "usdt_balance": self.usdt_balance,
-            "portfolio_value": portfolio_value,
-            "total_return": total_return,
-            "daily_return": daily_return
-        })
+        total_return = 0.0
+        daily_return = 0.0
+        
+        if self._inv_initial_x100 is not None:
+            total_return = portfolio_value * self._inv_initial_x100 - 100.0
+            
+        last_value = self._last_value
+        if last_value is not None and last_value > 0:
+            daily_return = ((portfolio_value / last_value) - 1) * 100
+        
+        btc_percentage = self.btc_balance * price / portfolio_value * 100 if portfolio_value else 0.0
+        
+        return float(portfolio_value), float(total_return), float(daily_return), float(btc_percentage)
+        
+    def get_last_portfolio_value(self):
+        """
+        Returns:
+            float: Most recently recorded portfolio value, or None if empty
+        """
+        return self._last_value
         
     def get_total_value_usd(self, current_price):
         """
@@ -181,17 +468,107 @@ class VirtualVault:
         """
         Convert vault to dictionary for storage
         
+        Histories are stored as their column arrays, with actions as int8
+        codes and timestamps as datetime64.
+        
         Returns:
             dict: Vault data
         """
         return {
             "btc_balance": self.btc_balance,
             "usdt_balance": self.usdt_balance,
-            "trade_history": self.trade_history,
-            "portfolio_history": self.portfolio_history,
-            "initial_portfolio_value": self.initial_portfolio_value
+            "trade_history": self._trades.columns(),
+            "portfolio_history": self._portfolio.columns(),
+            "initial_portfolio_value": self.initial_portfolio_value,
+            # Full precision; the history column only holds it as float32
+            "last_portfolio_value": self._last_value
         }
     
+    def to_arrow(self, history="portfolio"):
+        """
+        Export a history as a pyarrow Table (requires the optional pyarrow)
+        
+        Numeric and timestamp columns wrap the history buffers without
+        copying; actions become a dictionary column over their int8 codes.
+        
+        Args:
+            history (str): "portfolio" or "trades"
+            
+        Returns:
+            pyarrow.Table: One row per history entry
+        """
+        import pyarrow as pa
+        
+        source = self._trades if history == "trades" else self._portfolio
+        columns = {}
+        for name in source._cols:
+            values = source.column(name)
+            if name == "action":
+                columns[name] = pa.DictionaryArray.from_arrays(
+                    pa.array(values), pa.array(ACTION_LABELS.tolist())
+                )
+            else:
+                columns[name] = pa.array(values)
+        return pa.table(columns)
+    
+    def save_parquet(self, path, history="portfolio"):
+        """
+        Write a history to a Parquet file (requires the optional pyarrow)
+        
+        Args:
+            path (str): Destination file
+            history (str): "portfolio" or "trades"
+        """
+        import pyarrow.parquet as pq
+        
+        pq.write_table(self.to_arrow(history), path)
+    
+    def save(self, path):
+        """
+        Write the vault to a compressed .npz file
+        
+        The history columns are stored as raw binary arrays, so nothing is
+        formatted as text on save or parsed on load.
+        
+        Args:
+            path (str): Destination file
+        """
+        arrays = {}
+        for prefix, history in (("trade_history", self._trades), ("portfolio_history", self._portfolio)):
+            for name in history._cols:
+                arrays[f"{prefix}.{name}"] = history.column(name)
+        # None has no array form; NaN stands in for an unset value
+        for key, value in (
+            ("btc_balance", self.btc_balance),
+            ("usdt_balance", self.usdt_balance),
+            ("initial_portfolio_value", self.initial_portfolio_value),
+            ("last_portfolio_value", self._last_value)
+        ):
+            arrays[key] = np.float64(np.nan if value is None else value)
+        np.savez_compressed(path, **arrays)
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Read a vault written by save
+        
+        Args:
+            path (str): .npz file
+            
+        Returns:
+            VirtualVault: Restored virtual vault
+        """
+        data = {"trade_history": {}, "portfolio_history": {}}
+        with np.load(path) as npz:
+            for key in npz.files:
+                if "." in key:
+                    prefix, name = key.split(".", 1)
+                    data[prefix][name] = npz[key]
+                else:
+                    value = float(npz[key])
+                    data[key] = None if np.isnan(value) else value
+        return cls.from_dict(data)
+    
     @classmethod
     def from_dict(cls, data):
         """
@@ -203,14 +580,29 @@ class VirtualVault:
         Returns:
             VirtualVault: New virtual vault
         """
-        vault = cls(
-            initial_btc=data.get("btc_balance", 0.001),
-            initial_usdt=data.get("usdt_balance", 100)
-        )
+        # Bypass __init__: its seed portfolio row would only be thrown away
+        vault = cls.__new__(cls)
+        vault.btc_balance = data.get("btc_balance", 0.001)
+        vault.usdt_balance = data.get("usdt_balance", 100)
         
-        vault.trade_history = data.get("trade_history", [])
-        vault.portfolio_history = data.get("portfolio_history", [])
+        vault._trades = _History.from_columns(TRADE_DTYPES, data.get("trade_history", []))
+        vault._portfolio = _History.from_columns(PORTFOLIO_DTYPES, data.get("portfolio_history", []))
+        
+        # Older stores lack btc_percentage; derive it for those rows
+        pct = vault._portfolio.column("btc_percentage")
+        missing = np.isnan(pct)
+        if missing.any():
+            btc_value = (vault._portfolio.column("btc_balance") * vault._portfolio.column("btc_price"))[missing]
+            value = vault._portfolio.column("portfolio_value")[missing]
+            pct[missing] = np.divide(btc_value * 100, value, out=np.zeros_like(value), where=value != 0)
         vault.initial_portfolio_value = data.get("initial_portfolio_value", None)
+        values = vault._portfolio.column("portfolio_value")
+        vault._last_value = data.get("last_portfolio_value")
+        if vault._last_value is None and len(values):
+            vault._last_value = float(values[-1])
+        vault._deferred_ts = None
+        vault._trade_df = None
+        vault._portfolio_df = None
         
         return vault
         
@@ -221,13 +613,36 @@ class VirtualVault:
         Returns:
             pd.DataFrame: Trade history
         """
-        if not self.trade_history:
+        import pandas as pd
+        
+        if not len(self._trades):
             return pd.DataFrame()
             
-        df = pd.DataFrame(self.trade_history)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        return df
+        if self._trade_df is None or len(self._trade_df) != len(self._trades):
+            columns = self._trades.columns()
+            columns["action"] = ACTION_LABELS[columns["action"]]
+            self._trade_df = pd.DataFrame(columns)
+        return self._trade_df.copy()
         
+    def get_average_buy_price(self):
+        """
+        Get the volume-weighted average price of all BUY trades
+
+        Works on the trade columns directly, so no DataFrame is built just
+        to take a weighted mean.
+
+        Returns:
+            float: Average buy price, or 0 if there are no buys
+        """
+        buys = self._trades.column("action") == BUY
+        # Accumulate the float32 history in float64
+        amounts = self._trades.column("btc_amount")[buys].astype(np.float64)
+        total = amounts.sum()
+        if total <= 0:
+            return 0.0
+        prices = self._trades.column("price")[buys].astype(np.float64)
+        return float(np.dot(prices, amounts) / total)
+
     def get_portfolio_history_df(self, current_price=None):
         """
         Get portfolio history as pandas DataFrame with additional metrics
@@ -238,36 +653,82 @@ class VirtualVault:
         Returns:
             pd.DataFrame: Portfolio history
         """
-        if not self.portfolio_history:
+        import pandas as pd
+        
+        if not len(self._portfolio):
             return pd.DataFrame()
             
         # Update with current price if provided
         if current_price is not None:
             self.update_market_price(current_price)
             
-        df = pd.DataFrame(self.portfolio_history)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        df["date"] = df["timestamp"].dt.date
-        
-        # Calculate BTC percentage of portfolio
-        df["btc_percentage"] = (df["btc_balance"] * df["btc_price"]) / df["portfolio_value"] * 100
+        # Price updates only append rows, so extend the cached frame with the
+        # new ones; trades reset the cache and force a full rebuild
+        cached = self._portfolio_df
+        n = len(self._portfolio)
+        if cached is None or len(cached) > n:
+            df = self._build_portfolio_df(0)
+        elif len(cached) < n:
+            new_rows = self._build_portfolio_df(len(cached))
+            df = pd.concat([cached, new_rows], ignore_index=True)
+        else:
+            df = cached
+        self._portfolio_df = df
+        return df.copy()
+
+    def _build_portfolio_df(self, start):
+        """
+        Build the portfolio DataFrame for the history rows from ``start`` on
         
-        # Add action column from trade history for charting
-        if self.trade_history:
-            trade_df = self.get_trade_history_df()
-            df["action"] = "HOLD"
+        Args:
+            start (int): First portfolio history row to include
             
-            # Match trades to portfolio updates
-            for idx, row in df.iterrows():
-                # Find trades that happened before this portfolio update
-                trades = trade_df[trade_df["timestamp"] <= row["timestamp"]]
-                
-                if not trades.empty:
-                    # Get the most recent trade
-                    latest_trade = trades.iloc[-1]
-                    
-                    # Only use the action if it's from the same timestamp
-                    if latest_trade["timestamp"] == row["timestamp"]:
-                        df.at[idx, "action"] = latest_trade["action"]
-        
-        return df
\ No newline at end of file
+        Returns:
+            pd.DataFrame: Rows with timestamp, date, btc_percentage and action
+        """
+        import pandas as pd
+        
+        history = self._portfolio
+        timestamps = history.column("timestamp", start)
+        df = pd.DataFrame({
+            "timestamp": timestamps,
+            "btc_price": history.column("btc_price", start),
+            "btc_balance": history.column("btc_balance", start),
+            "usdt_balance": history.column("usdt_balance", start),
+            "portfolio_value": history.column("portfolio_value", start),
+            "total_return": history.column("total_return", start),
+            "daily_return": history.column("daily_return", start),
+            # Midnight of each row's day, truncated on the raw datetime64 values
+            "date": timestamps.astype("datetime64[D]").astype(timestamps.dtype),
+            "btc_percentage": history.column("btc_percentage", start)
+        })
+        
+        # Add action column from trade history for charting: a row takes the
+        # action of the latest trade stamped at exactly its timestamp.
+        # Appends are usually in time order, but not always (a replayed
+        # history, a wall clock stepping back), so sort when needed.
+        if len(self._trades):
+            # Only the two columns, straight from the buffers: no full trade
+            # DataFrame (or copy of it) per portfolio rebuild
+            trade_df = pd.DataFrame({
+                "timestamp": self._trades.column("timestamp"),
+                "action": ACTION_LABELS[self._trades.column("action")]
+            })
+            if not trade_df["timestamp"].is_monotonic_increasing:
+                # Stable, so the latest-appended of equal stamps still wins
+                trade_df = trade_df.sort_values("timestamp", kind="stable")
+            order = None
+            if not df["timestamp"].is_monotonic_increasing:
+                order = np.argsort(timestamps, kind="stable")
+                df = df.iloc[order]
+            df = pd.merge_asof(
+                df, trade_df, on="timestamp",
+                direction="backward", tolerance=pd.Timedelta(0)
+            )
+            if order is not None:
+                # Back to history order
+                df.index = order
+                df = df.sort_index()
+            df["action"] = df["action"].fillna("HOLD")
+        
+        return df